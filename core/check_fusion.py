@@ -0,0 +1,87 @@
+import operator
+import threading
+import weakref
+
+import numpy as np
+import pandas as pd
+
+_operators = {"<": operator.lt, "<=": operator.le, ">": operator.gt,
+              ">=": operator.ge, "==": operator.eq, "!=": operator.ne}
+
+
+# Predicate masks over one dataframe, memoized so that the dataframe checks of
+# a schema share the sub-expressions they have in common. pandera hands the
+# same frame to every dataframe check of a validation, so a mask such as
+# df["location_type"] == "conflict_zone" is computed once for all of them.
+#
+# Equality tests on a column are answered from a single factorization of that
+# column: one pass turns it into integer codes, after which every eq/isin is a
+# comparison of small integers instead of a scan over strings.
+class Predicates():
+    def __init__(self, df):
+        # A weak reference, the memo must not keep the frame alive
+        self.df_ref = weakref.ref(df)
+        self.masks = {}
+        self.factorized = {}
+
+    @property
+    def df(self):
+        return self.df_ref()
+
+    def _memo(self, key, compute):
+        if key not in self.masks:
+            self.masks[key] = compute()
+        return self.masks[key]
+
+    def _codes(self, column):
+        if column not in self.factorized:
+            codes, uniques = pd.factorize(self.df[column])
+            self.factorized[column] = (codes, pd.Index(uniques))
+        return self.factorized[column]
+
+    def _mask(self, values):
+        return pd.Series(values, index=self.df.index)
+
+    # Rows where column equals value
+    def eq(self, column, value):
+        def compute():
+            codes, uniques = self._codes(column)
+            position = uniques.get_indexer([value])[0]
+            if position < 0:
+                return self._mask(np.zeros(len(codes), dtype=bool))
+            return self._mask(codes == position)
+        return self._memo(("eq", column, value), compute)
+
+    # Rows where column is one of values
+    def isin(self, column, values):
+        def compute():
+            codes, uniques = self._codes(column)
+            positions = uniques.get_indexer(list(values))
+            return self._mask(np.isin(codes, positions[positions >= 0]))
+        return self._memo(("isin", column, tuple(values)), compute)
+
+    # Rows where column is missing
+    def isnull(self, column):
+        return self._memo(("isnull", column), lambda: self.df[column].isnull())
+
+    # Rows where `column op value` holds, op is one of <, <=, >, >=, ==, !=
+    def compare(self, column, op, value):
+        return self._memo(("compare", column, op, value),
+                          lambda: _operators[op](self.df[column], value))
+
+
+_predicates = {}
+_lock = threading.Lock()
+
+
+# Returns the memoized predicates of df, shared by all checks that run on it
+def predicates(df):
+    key = id(df)
+    with _lock:
+        entry = _predicates.get(key)
+        if entry is not None and entry[0]() is df:
+            return entry[1]
+        fused = Predicates(df)
+        # The memo is dropped together with the frame
+        _predicates[key] = (weakref.ref(df, lambda _, key=key: _predicates.pop(key, None)), fused)
+        return fused
@@ -0,0 +1,83 @@
+import re
+import threading
+import weakref
+
+import numpy as np
+import pandas as pd
+
+
+# A constraint on a block of columns that all hold the same kind of values, such
+# as the age columns of an age distribution or the flood zone columns of a flood
+# level file. The columns are selected by a regex on their names or by position
+# (start/stop, as in a slice), and the rules are applied to the whole block as
+# one 2-D NumPy array instead of one pandera Field per column:
+#  - dtype: the values must be numeric, and whole numbers when dtype is int,
+#  - min_value/max_value: the values must lie in that range,
+#  - total: the values of every column must add up to total (within tolerance).
+#
+# valid(df) can be returned from a pa.dataframe_check as is, pandera then reports
+# each failing value with its column and row.
+class ColumnGroup():
+    def __init__(self, regex=None, start=0, stop=None, dtype=float, nullable=False,
+                 min_value=None, max_value=None, total=None, tolerance=0):
+        self.regex = re.compile(regex) if regex is not None else None
+        self.start = start
+        self.stop = stop
+        self.dtype = dtype
+        self.nullable = nullable
+        self.min_value = min_value
+        self.max_value = max_value
+        self.total = total
+        self.tolerance = tolerance
+        self.lock = threading.Lock()
+        self.last = None
+
+    def columns(self, df):
+        if self.regex is not None:
+            return [column for column in df.columns if self.regex.fullmatch(str(column))]
+        return list(df.columns[self.start:self.stop])
+
+    # The block as a float array, values that are not numeric become NaN. The
+    # array of the last frame is kept, as the checks of one validation share it.
+    def values(self, df):
+        with self.lock:
+            if self.last is not None and self.last[0]() is df:
+                return self.last[1], self.last[2]
+        block = df[self.columns(df)]
+        if all(pd.api.types.is_numeric_dtype(dtype) for dtype in block.dtypes):
+            values = block.to_numpy(dtype="float64", na_value=np.nan)
+        else:
+            values = block.apply(pd.to_numeric, errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+        missing = block.isna().to_numpy()
+        with self.lock:
+            self.last = (weakref.ref(df), values, missing)
+        return values, missing
+
+    # Element-wise result of the dtype and range rules, True where a value is valid
+    def valid(self, df):
+        values, missing = self.values(df)
+        with np.errstate(invalid="ignore"):
+            valid = ~np.isnan(values)
+            if self.dtype is int:
+                valid &= np.mod(values, 1) == 0
+            if self.min_value is not None:
+                valid &= values >= self.min_value
+            if self.max_value is not None:
+                valid &= values <= self.max_value
+        if self.nullable:
+            valid |= missing
+        # pandera expects a result for every value of the frame, the columns
+        # outside of the group are valid
+        result = np.ones(df.shape, dtype=bool)
+        result[:, df.columns.get_indexer(self.columns(df))] = valid
+        return pd.DataFrame(result, index=df.index, columns=df.columns)
+
+    # Sum of every column of the group, missing values count as 0
+    def sums(self, df):
+        values, _ = self.values(df)
+        return pd.Series(np.nansum(values, axis=0), index=self.columns(df))
+
+    # Columns whose sum is not total, with their sums
+    def sum_violations(self, df):
+        sums = self.sums(df)
+        return sums[np.abs(sums - self.total) > self.tolerance]
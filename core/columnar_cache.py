@@ -0,0 +1,81 @@
+import hashlib
+import os
+import tempfile
+
+# pyarrow is optional, without it the cache is disabled and every file is parsed from csv
+try:
+    import pyarrow.feather as feather
+except ImportError:
+    feather = None
+
+
+# On-disk cache of parsed input files stored as Feather (Arrow IPC) files.
+# An entry is keyed by the absolute path of the csv file, its size, mtime,
+# a hash of its content and the arguments it was read with, so an edited
+# input file never hits a stale copy.
+class ColumnarCache():
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+
+    @property
+    def enabled(self):
+        return feather is not None
+
+    @staticmethod
+    def content_hash(path, block_size=1 << 20):
+        digest = hashlib.blake2b(digest_size=16)
+        with open(path, "rb") as file:
+            for block in iter(lambda: file.read(block_size), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def _path_prefix(self, path):
+        return hashlib.blake2b(path.encode(), digest_size=8).hexdigest()
+
+    # Returns the location of the cache entry for the current version of path.
+    # The name is made of a hash of the path, of the file version (size, mtime
+    # and content) and of the read arguments, so that the variants of one file
+    # read with different arguments are kept side by side.
+    def entry_path(self, path, read_args=None):
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        version = hashlib.blake2b(digest_size=16)
+        version.update(f"{stat.st_size}:{stat.st_mtime_ns}:".encode())
+        version.update(self.content_hash(path).encode())
+        args = hashlib.blake2b(repr(sorted((read_args or {}).items())).encode(), digest_size=8)
+        return os.path.join(self.cache_dir,
+                            f"{self._path_prefix(path)}-{version.hexdigest()}-{args.hexdigest()}.feather")
+
+    # Returns the dataframe stored in the given entry, or None if there is none
+    def load(self, entry):
+        if not self.enabled or not os.path.isfile(entry):
+            return None
+        # Memory map the file so that the arrow buffers are read without copying
+        return feather.read_table(entry, memory_map=True).to_pandas()
+
+    def store(self, entry, df):
+        if not self.enabled:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        prefix, version, _ = os.path.basename(entry).split("-")
+        # Drop the entries of older versions of the same file, whatever they were read with
+        for old_name in os.listdir(self.cache_dir):
+            parts = old_name.split("-")
+            if old_name.endswith(".feather") and len(parts) == 3 \
+                    and parts[0] == prefix and parts[1] != version:
+                try:
+                    os.remove(os.path.join(self.cache_dir, old_name))
+                except FileNotFoundError:
+                    pass
+        # A temporary file of its own for every writer, threads may store the same entry
+        descriptor, tmp_entry = tempfile.mkstemp(prefix=os.path.basename(entry) + ".",
+                                                 suffix=".tmp", dir=self.cache_dir)
+        os.close(descriptor)
+        try:
+            feather.write_feather(df, tmp_entry)
+            os.replace(tmp_entry, entry)
+        except Exception:
+            # Columns arrow cannot represent (e.g. mixed object columns) are
+            # simply not cached, the csv is parsed again next time
+            if os.path.exists(tmp_entry):
+                os.remove(tmp_entry)
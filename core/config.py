@@ -1,10 +1,92 @@
+import os
+import tempfile
+
 locations = "locations.csv"
 routes = "routes.csv"
 conflicts = "conflicts.csv"
 closures = "closures.csv"
 conflict_period = "conflict_period.csv"
 distr_age = "age-distr-new.csv"
+sim_period = "sim_period.csv"
+simsettings = "simsettings.yml"
+# Glob pattern of the per-attribute demographic files, validated as one family
+demograohic_files_pattern = "demographic_*.csv"
+# All input files that FabGuard loads up front, before the checks run
+input_files = [locations, routes, conflicts, closures, conflict_period, distr_age, sim_period]
+# Key columns that cross-file checks look values up in: name -> (file, columns).
+# FabGuard.index(name) returns a hash index of the distinct values in the columns.
+key_indexes = {
+    "locations.name": (locations, ["name"]),
+    "locations.country": (locations, ["country"]),
+    "routes.name1": (routes, ["name1"]),
+    "routes.name2": (routes, ["name2"]),
+    "routes.names": (routes, ["name1", "name2"]),
+}
+# A route may be at most route_distance_tolerance (relative) plus
+# route_distance_slack_km shorter than the great-circle distance between its
+# locations, and at most route_max_detour times longer (plus the slack)
+route_distance_tolerance = 0.1
+route_max_detour = 3.0
+route_distance_slack_km = 1.0
+# Locations closer to each other than this many km are reported as duplicates
+duplicate_coordinates_km = 0.01
 input_file_dir = "/Users/rumyananeykova/Dev/FabSim3/plugins/FabFlee/config_files/car/input_csv"
 
+# lazy = True collects all failures of a file, False stops the run at the first failure
 lazy = True
-log_file = "input_validation_log.txt"
\ No newline at end of file
+# Keep at most this many failures per check, None keeps all of them
+max_failures_per_check = None
+# Stop validating further files after this many seconds, None for no limit
+time_budget = None
+# Validate files in chunks of this many rows instead of loading them at once, None disables streaming
+chunk_size = None
+log_file = "input_validation_log.txt"
+# Every failure case is written in bulk to failure_log (.jsonl, or .parquet with
+# pyarrow), the log file only gets a summary per file. None writes every
+# failure case to the log file instead.
+failure_log = "input_validation_failures.jsonl"
+# verify_dirs writes the logs of input directories with the same parent to
+# log_dirs/<name of the input directory> under that parent
+log_dirs = "fabguard_logs"
+
+# Read all input_files concurrently before verify() runs the checks
+prefetch = True
+prefetch_workers = 8
+
+# Only validate files whose inputs or scheme changed since the previous run, the
+# results of that run are kept in manifest_file in the log directory (see FabGuard)
+incremental = False
+manifest_file = "fabguard_manifest.json"
+# Within an incremental run, only validate the rows that changed since the
+# previous run. The row hashes of that run are kept in row_snapshot_dir, in the log directory as well.
+row_delta = False
+row_snapshot_dir = "fabguard_rows"
+
+# Number of processes verify() validates the registered files with, None validates them one after another
+verify_workers = None
+
+# Number of processes a family of files (see FabGuard.register_family_for_test)
+# is validated with, None validates them one after another
+family_workers = None
+
+# Number of threads verify() loads the files and runs the validations on in
+# dependency order (see scheduler.py), None runs them one after another
+scheduler_workers = None
+
+# Memory budget in bytes for the dataframes FabGuard keeps loaded, None for no limit
+max_cache_bytes = 2 * 1024 ** 3
+
+# Number of compiled dynamic-column schemas kept for reuse (see schema_cache.py)
+max_cached_schemas = 256
+
+# Keep a binary columnar (Feather) copy of every parsed input file, so that
+# unchanged files are not parsed again from csv. Needs pyarrow.
+columnar_cache = True
+cache_dir = os.path.join(os.path.expanduser("~"), ".cache", "fabguard")
+
+# Memory-map day x zone matrix files (conflicts, flood levels) from a NumPy
+# copy kept in cache_dir instead of parsing them into memory (see matrix_file.py)
+matrix_mmap = False
+
+# Unix socket the validation server (server.py) listens on
+server_socket = os.path.join(tempfile.gettempdir(), "fabguard.sock")
\ No newline at end of file
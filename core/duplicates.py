@@ -0,0 +1,34 @@
+import numpy as np
+import pandas as pd
+
+
+# Integer code of every unordered pair (first[i], second[i]): the values of both
+# columns are factorized together, and a pair is coded from its smaller and
+# larger value code, so A,B and B,A get the same code
+def unordered_pair_codes(first, second):
+    codes, uniques = pd.factorize(pd.concat([pd.Series(first), pd.Series(second)],
+                                            ignore_index=True))
+    codes = codes.astype("int64")
+    first_codes, second_codes = codes[:len(first)], codes[len(first):]
+    low = np.minimum(first_codes, second_codes)
+    high = np.maximum(first_codes, second_codes)
+    return low * (len(uniques) + 1) + high
+
+
+# Positions of the rows that share a code, one array per code that appears more
+# than once, in the order the codes first appear
+def duplicate_groups(codes):
+    codes = np.asarray(codes)
+    order = np.argsort(codes, kind="stable")
+    sorted_codes = codes[order]
+    starts = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]])
+    sizes = np.diff(np.r_[starts, len(codes)])
+    # Only the rows of codes that appear more than once are split into groups
+    duplicated = sizes > 1
+    if not duplicated.any():
+        return []
+    rows = order[np.repeat(duplicated, sizes)]
+    groups = np.split(rows, np.cumsum(sizes[duplicated])[:-1])
+    # The first row of each group is its smallest one, as the sort is stable
+    firsts = np.array([group[0] for group in groups], dtype="int64")
+    return [groups[i] for i in np.argsort(firsts, kind="stable")]
@@ -39,3 +39,55 @@ class Errors:
         err = f"Invalid sum {file}: The sum of all values in a columns should 100). \n"\
               f"Invalid columns, sum: {invalid_input}"
         return err
+
+    def sum_of_columns_is_1(invalid_input, file):
+        err = f"Invalid sum {file}: The sum of all values in a column should be 1. \n"\
+              f"Invalid columns, sum: {invalid_input}"
+        return err
+
+    def route_distance_err(invalid_input, file):
+        err = f"Invalid data for file {file}: The distance of a route should agree with \n"\
+              f"the great-circle distance between the coordinates of its locations. \n"\
+              f"Invalid rows (row, distance, great-circle distance): {invalid_input}"
+        return err
+
+    def location_duplicate_coords_err(invalid_input, file):
+        err = f"Invalid location coordinates in file {file}: Locations have the same or almost the same coordinates. \n"\
+              f"Invalid rows (row, row, distance in km): {invalid_input}"
+        return err
+
+    def network_unreachable_camps_err(invalid_input, file):
+        err = f"Invalid route network in file {file}: Every camp should be reachable from a conflict zone. \n"\
+              f"Unreachable camps: {invalid_input}"
+        return err
+
+    def network_isolated_locations_err(invalid_input, file):
+        err = f"Invalid route network in file {file}: Every location should have at least one route. \n"\
+              f"Isolated locations: {invalid_input}"
+        return err
+
+    def network_disconnected_err(invalid_input, file):
+        err = f"Invalid route network in file {file}: The routes should connect all locations. \n"\
+              f"Locations disconnected from the largest component: {invalid_input}"
+        return err
+
+    def route_duplicate_err(invalid_input, file):
+        err = f"Invalid data for file {file}: There should be one route between two locations, \n"\
+              f"routes A,B and B,A are the same route. \n"\
+              f"Duplicate routes (name1, name2, rows, distances): {invalid_input}"
+        return err
+
+    def closures_start_end_err(invalid_input, file):
+        err = f"Invalid data for file {file}: closure_start should not be after closure_end. \n"\
+              f"Invalid rows: {invalid_input}"
+        return err
+
+    def closures_overlap_err(invalid_input, file):
+        err = f"Invalid data for file {file}: Closures of the same type between the same names should not overlap. \n"\
+              f"Rows overlapping an earlier closure: {invalid_input}"
+        return err
+
+    def closures_period_err(invalid_input, file):
+        err = f"Invalid data for file {file}: Closures should start and end within the simulation period. \n"\
+              f"Invalid rows: {invalid_input}"
+        return err
@@ -1,11 +1,32 @@
+import numpy as np
 import pandas as pd
 import pandera as pa
 import datetime
 from pandera import Column, Check, extensions, DataFrameSchema
 import os
+import glob
+import collections
+import contextlib
+import contextvars
+import weakref
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 
 import config
 import functools
+from columnar_cache import ColumnarCache
+import schema_hints
+from frame_cache import FrameCache
+import streaming
+from key_index import KeyIndexes
+from scheduler import CheckScheduler, scheme_reads
+from validation_mode import ValidationMode
+import schema_cache
+from manifest import Manifest
+from simulation_context import SimulationContext
+from matrix_file import Matrix
+from failure_sink import FailureSink
+import row_delta
+from row_delta import RowSnapshots
 
 from pandera.typing import Series
 
@@ -21,48 +42,341 @@ def makeRegistrar():
 
 fgcheck = makeRegistrar()
 
-class FabGuard():
-    _instance = None
+# The FabGuard instance whose validation is running in the current thread.
+# Schemas reach the files of the input directory they validate through it.
+_active = contextvars.ContextVar("fabguard_active", default=None)
 
-    def __new__(cls, input_dir):
-        if cls._instance is None:
-            cls._instance = super(FabGuard, cls).__new__(cls)
-            cls._instance.input_dir = input_dir
-        return cls._instance
+# A validation context for one input directory. Every instance owns its input
+# directory, frame cache and log files, so several directories can be validated
+# at the same time in one interpreter (see verify_dirs).
+class FabGuard():
 
-    def __init__(self, input_dir):
+    # A worker instance (see verify with workers) collects its failure cases in
+    # self.collected instead of writing them to the log of the parent.
+    # The text log, the failure log and the state of incremental runs (manifest
+    # and row snapshots) are kept in log_dir, by default the parent of the input directory
+    def __init__(self, input_dir, loaded_files=None, worker=False, log_dir=None):
         self.input_dir = input_dir
-        self.loaded_files = {}
-        self.log_file_name =  os.path.join(self.input_dir, '..', config.log_file)
+        self.log_dir = log_dir or os.path.join(self.input_dir, '..')
+        # A frame cache may be shared between instances, its keys are resolved
+        # paths so frames of different input directories never mix
+        self.loaded_files = loaded_files if loaded_files is not None \
+            else FrameCache(config.max_cache_bytes)
+        self.planning = False
+        self.stream = None
+        self.error_count = 0
+        self.mode = ValidationMode.from_config()
+        self.stopped = False
+        self.verifying = False
+        self.manifest = None
+        self.recording = None
+        self.row_snapshots = RowSnapshots(os.path.join(self.log_dir, config.row_snapshot_dir))
+        self.deltas = {}
+        self.hashed_rows = {}
+        self.saved_snapshots = set()
+        self.key_indexes = KeyIndexes(self)
+        self.simulation = SimulationContext(self)
+        self.columnar_cache = ColumnarCache(config.cache_dir)
+        self.collected = [] if worker else None
+        self.log_file_name =  os.path.join(self.log_dir, config.log_file)
+        self.failure_sink = None
+        if worker:
+            return
+        os.makedirs(self.log_dir, exist_ok=True)
+        if config.failure_log:
+            self.failure_sink = FailureSink(os.path.join(self.log_dir, config.failure_log),
+                                            self.input_dir)
         with open(self.log_file_name, "w+") as log_file:
             log_file.write("Timestamp: %s \n" % datetime.datetime.now())
             log_file.write("\n========================\n")
 
+    # Returns the FabGuard instance that is validating in the current thread
+    @staticmethod
+    def current():
+        return _active.get()
 
+    # Kept for schemas written against the former singleton
     @staticmethod
     def get_instance():
-        return FabGuard._instance
-
-    def load_file(self, file,**kwargss):
-        if file in self.loaded_files:
-            return self.loaded_files[file]
-        else:
-            df = pd.read_csv(os.path.join(self.input_dir,file),**kwargss)
-            #if (df.iloc[1].str.startswith("#")):
-            first_column = df.columns[0]
-            if df.columns[0].startswith('#'):
-                # Remove the first character aand any trailing quotes from start and end
-                new_column_name = first_column.lstrip("#").lstrip('\"').rstrip('\"')
-                df = df.rename(columns={first_column: new_column_name})
-            self.loaded_files[file]=df
+        return FabGuard.current()
+
+    # Makes this instance the one the schemas see while validating
+    @contextlib.contextmanager
+    def activate(self):
+        token = _active.set(self)
+        try:
+            yield self
+        finally:
+            _active.reset(token)
+
+    # Reads a csv file from the input directory and cleans up its header.
+    # When the scheme that validates the file is given, its declared types and
+    # columns are used to parse the file (see schema_hints.read_args).
+    # Unchanged files are served from the columnar cache when it is enabled.
+    def read_file(self, file, scheme=None, **kwargss):
+        path = os.path.join(self.input_dir, file)
+        read_args = kwargss
+        if scheme is not None:
+            header = pd.read_csv(path, nrows=0).columns
+            read_args = {**schema_hints.read_args(scheme, header), **kwargss}
+        cache_entry = None
+        if config.columnar_cache and self.columnar_cache.enabled:
+            cache_entry = self.columnar_cache.entry_path(path, read_args)
+            df = self.columnar_cache.load(cache_entry)
+            if df is not None:
+                return df
+        try:
+            df = pd.read_csv(path,**read_args)
+        except (ValueError, TypeError):
+            if scheme is None:
+                raise
+            # The file does not parse into the declared types, read it as is
+            # and let the scheme report the invalid values
+            return self.read_file(file, **kwargss)
+        #if (df.iloc[1].str.startswith("#")):
+        first_column = df.columns[0]
+        if df.columns[0].startswith('#'):
+            # Remove the first character aand any trailing quotes from start and end
+            new_column_name = schema_hints.clean_column_name(first_column)
+            df = df.rename(columns={first_column: new_column_name})
+        if cache_entry is not None:
+            self.columnar_cache.store(cache_entry, df)
         return df
 
+    # Reads a csv file in chunks of chunk_size rows. Each chunk is indexed by
+    # its row numbers in the whole file, so failure cases point at global rows.
+    def read_chunks(self, file, chunk_size, scheme=None):
+        path = os.path.join(self.input_dir, file)
+        read_args = {}
+        if scheme is not None:
+            # dtypes are left to the scheme, a single bad value would abort the whole stream
+            header = pd.read_csv(path, nrows=0).columns
+            read_args = schema_hints.read_args(scheme, header)
+            read_args = {"usecols": read_args["usecols"]} if "usecols" in read_args else {}
+        offset = 0
+        for chunk in pd.read_csv(path, chunksize=chunk_size, **read_args):
+            chunk.index = pd.RangeIndex(offset, offset + len(chunk))
+            offset += len(chunk)
+            first_column = chunk.columns[0]
+            if first_column.startswith('#'):
+                chunk = chunk.rename(columns={first_column: schema_hints.clean_column_name(first_column)})
+            yield chunk
+
+    # Returns the file as read_file reads it for the scheme, loaded once per run.
+    # Frames read for different schemes or arguments are cached apart, as
+    # they may differ in their columns and types.
+    def load_file(self, file, scheme=None, **kwargss):
+        path = os.path.join(self.input_dir, file)
+        variant = _read_variant(scheme, kwargss)
+        df = self.loaded_files.get(path, variant)
+        if df is None:
+            df = self.typed_frame(file) if scheme is None and not kwargss else None
+            if df is None:
+                df = self.read_file(file, scheme, **kwargss)
+            self.loaded_files.put(path, df, variant)
+        return df
+
+    # Returns a frame of the file that was loaded for the scheme validating it
+    # and still has every column of the file, None if there is none. Such a
+    # frame also serves the checks that read the file as it is, so that the
+    # file is not parsed a second time.
+    def typed_frame(self, file):
+        path = os.path.join(self.input_dir, file)
+        header = None
+        for (scheme_name, kwargss), df in self.loaded_files.variants(path):
+            if scheme_name is None or kwargss != _read_variant()[1]:
+                continue
+            if header is None:
+                header = [schema_hints.clean_column_name(column)
+                          for column in pd.read_csv(path, nrows=0).columns]
+            if list(df.columns) == header:
+                return df
+        return None
+
+    # Returns the hash index declared under name in config.key_indexes, e.g.
+    # "routes.names", for vectorized membership checks across files
+    def index(self, name):
+        return self.key_indexes.get(name)
+
+    # Loads the given files (by default all input files listed in the config)
+    # concurrently on a thread pool, so that the checks find them in
+    # loaded_files instead of reading them one by one in the middle of validation.
+    # schemes maps a file to the scheme it is validated with. The files in reads
+    # are also loaded as they are, the way the checks of other schemes load them.
+    def prefetch(self, files=None, workers=None, schemes=None, reads=()):
+        files = config.input_files if files is None else files
+        schemes = schemes or {}
+        loads = [(file, schemes.get(file)) for file in files] + [(file, None) for file in reads]
+        loads = [(file, scheme) for file, scheme in dict.fromkeys(loads)
+                 if os.path.isfile(os.path.join(self.input_dir, file))
+                 and not self.loaded_files.contains(os.path.join(self.input_dir, file),
+                                                    _read_variant(scheme))]
+        if not loads:
+            return
+        # The files that are also read for their scheme are loaded as they are
+        # once that is done, from the typed frame if it can serve them (see typed_frame)
+        typed = {file for file, scheme in loads if scheme is not None}
+        plain = [file for file, scheme in loads if scheme is None and file in typed]
+        loads = [(file, scheme) for file, scheme in loads if scheme is not None or file not in typed]
+        with ThreadPoolExecutor(max_workers=workers or config.prefetch_workers) as pool:
+            futures = {(file, scheme): pool.submit(self.read_file, file, scheme)
+                       for file, scheme in loads}
+        for (file, scheme), future in futures.items():
+            # A file that fails to parse is left out, load_file reports the
+            # error later from within the check that needs it
+            if future.exception() is None:
+                self.loaded_files.put(os.path.join(self.input_dir, file), future.result(),
+                                      _read_variant(scheme))
+        if plain:
+            with ThreadPoolExecutor(max_workers=workers or config.prefetch_workers) as pool:
+                for file in plain:
+                    pool.submit(self.load_file, file)
+
+    # Whether validating a file with the scheme loads the whole file. Files
+    # validated in chunks are not, preloading them would defeat streaming, and
+    # neither are matrix files, they are read into arrays (see validate_matrix).
+    def validated_as_frame(self, scheme):
+        return not config.chunk_size and not hasattr(scheme, 'matrix_rules')
+
+    # Runs the fgcheck functions without validating anything and returns the
+    # (scheme, input_file) pairs they register for testing. Checks are expected
+    # to do nothing but register files for testing.
+    def plan(self):
+        self.planned = []
+        self.planning = True
+        try:
+            for key in fgcheck.all:
+                fgcheck.all[key](self)
+        finally:
+            self.planning = False
+        return self.planned
+
     # Executes all files that are decorated with the fgcheck decorator
-    def verify(self):
-        for key in fgcheck.all:
-            fgcheck.all[key](self)
+    # With more than one worker, the files registered by the checks are
+    # validated in a process pool (see verify_parallel). mode is a
+    # ValidationMode, by default the one set up in the config. An incremental
+    # run only validates the files whose inputs or scheme changed since the
+    # previous run and logs the stored failures of the others (see Manifest).
+    def verify(self, workers=None, mode=None, incremental=None):
+        self.mode = (mode or ValidationMode.from_config()).start()
+        self.stopped = False
+        incremental = config.incremental if incremental is None else incremental
+        self.manifest = Manifest(os.path.join(self.log_dir, config.manifest_file)) \
+            if incremental else None
+        self.deltas = {}
+        self.saved_snapshots = set()
+        workers = workers or config.verify_workers
+        self.verifying = True
+        try:
+            if workers and workers > 1:
+                self.verify_parallel(workers)
+            elif config.scheduler_workers:
+                self.verify_scheduled(config.scheduler_workers)
+            else:
+                self.verify_serial()
+        finally:
+            self.verifying = False
+            if self.failure_sink is not None:
+                self.failure_sink.close()
+        if self.manifest is not None:
+            self.manifest.save()
+
+    def verify_serial(self):
+        if config.prefetch:
+            tasks = self.plan()
+            schemes = {input_file: scheme for scheme, input_file in tasks}
+            reads = [file for scheme, _ in tasks for file in scheme_reads(scheme)
+                     if file.endswith(".csv")]
+            files = list(schemes) if config.chunk_size else config.input_files + list(schemes)
+            files = [file for file in files
+                     if file not in schemes or self.validated_as_frame(schemes[file])]
+            self.prefetch(files, schemes=schemes, reads=reads)
+        with self.activate():
+            for key in fgcheck.all:
+                if self.stopped:
+                    break
+                fgcheck.all[key](self)
+
+    # Loads the files and validates the (scheme, input_file) pairs registered by
+    # the checks on a thread pool, in the order of their dependencies (see CheckScheduler)
+    def verify_scheduled(self, workers):
+        tasks = self.plan()
+        fingerprints, cached = self.lookup_tasks(tasks)
+        pending = [task for task, result in zip(tasks, cached) if result is None]
+        results = CheckScheduler(self, workers).run(pending)
+        self.log_collected(tasks, _merge_results(cached, results), fingerprints)
+
+    # Validates every (scheme, input_file) pair registered by the checks in a
+    # process pool. The failure cases are sent back to this process and logged
+    # in the order the checks registered the files, as verify would log them.
+    def verify_parallel(self, workers):
+        self._validate_in_pool(self.plan(), workers)
+
+    # Validates the tasks that have no stored result in a process pool of
+    # workers and logs the failures of all tasks in task order, as soon as each
+    # is validated. The tasks left once the run stops are cancelled.
+    def _validate_in_pool(self, tasks, workers):
+        fingerprints, cached = self.lookup_tasks(tasks)
+        pending = [task for task, result in zip(tasks, cached) if result is None]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_validate_in_worker, self.input_dir, scheme,
+                                   input_file, config.chunk_size, self.mode)
+                       for scheme, input_file in pending]
+            results = (future.result() for future in futures)
+            self.log_collected(tasks, _merge_results(cached, results), fingerprints)
+            for future in futures:
+                future.cancel()
+
+    # Returns the manifest fingerprint of every task and the failures stored
+    # for it, None for the tasks that have to be validated
+    def lookup_tasks(self, tasks):
+        if self.manifest is None:
+            return [None] * len(tasks), [None] * len(tasks)
+        fingerprints = [self.manifest.fingerprint(self.input_dir, scheme, input_file,
+                                                  scheme_reads(scheme))
+                        for scheme, input_file in tasks]
+        cached = [self.manifest.lookup(scheme, input_file, fingerprint)
+                  for (scheme, input_file), fingerprint in zip(tasks, fingerprints)]
+        return fingerprints, cached
+
+    # Logs the failures collected by workers for the given tasks, in task
+    # order, until the validation mode stops the run
+    def log_collected(self, tasks, results, fingerprints=None):
+        fingerprints = fingerprints or [None] * len(tasks)
+        for (scheme, input_file), collected, fingerprint in zip(tasks, results, fingerprints):
+            if self.stopped or self.out_of_time(input_file):
+                break
+            for failure_cases, failed_file in collected:
+                self.log_errors(failure_cases, failed_file)
+            if fingerprint is not None and self.mode.collects_all:
+                self.manifest.record(scheme, input_file, fingerprint, collected)
+            if collected and self.mode.stops_at_first_failure:
+                self.stop("Validation stopped at the first failure")
+
+    # Stops the run once the time budget of the validation mode is used up
+    def out_of_time(self, input_file):
+        if self.mode.expired():
+            self.stop(f"Validation stopped: the time budget of {self.mode.time_budget}s "
+                      f"was used up before {input_file}, the remaining files were not validated")
+        return self.stopped
+
+    def stop(self, reason):
+        self.stopped = True
+        if self.collected is None:
+            with open(self.log_file_name, "a+") as log_file:
+                log_file.write(f"{reason}\n")
 
     def log_errors(self, failure_cases, input_file):
+        failure_cases = self.mode.limit(failure_cases)
+        if self.recording is not None:
+            self.recording.append((failure_cases, input_file))
+        if self.collected is not None:
+            self.collected.append((failure_cases, input_file))
+            return
+        self.error_count += len(failure_cases)
+        if self.failure_sink is not None:
+            self.log_summary(failure_cases, input_file)
+            return
         with open(self.log_file_name, "a+") as log_file:
             log_file.write(f"Errors for file:{input_file}\n")
             for index, failure in enumerate(failure_cases['failure_case'], start=1):
@@ -72,24 +386,284 @@ class FabGuard():
                 log_file.write(str(failure))
                 log_file.write("\n========================\n")
 
-    def register_for_test(self, scheme, input_file):
-        df = self.load_file(input_file)
+    # Returns the input files that match a glob pattern such as demographic_*.csv, sorted
+    def expand(self, pattern):
+        paths = glob.glob(os.path.join(glob.escape(self.input_dir), pattern))
+        return sorted(os.path.relpath(path, self.input_dir) for path in paths)
+
+    # Registers every file that matches pattern for testing with scheme. The
+    # files are validated in a process pool of config.family_workers, and the
+    # failures of each file are logged in file order as soon as it is validated.
+    # While planning, in a worker, or without family workers, every file is
+    # registered on its own as with register_for_test.
+    def register_family_for_test(self, scheme, pattern, workers=None):
+        files = self.expand(pattern)
+        workers = workers or config.family_workers
+        if self.planning or self.collected is not None or not workers or workers <= 1:
+            for input_file in files:
+                self.register_for_test(scheme, input_file)
+            return
+        if self.stopped:
+            return
+        self._validate_in_pool([(scheme, input_file) for input_file in files], workers)
+
+    # Writes the failure cases to the failure sink in bulk, and only the number
+    # of failures of every check and its first failure case to the text log.
+    # verify() closes the sink when it is done, the failures of a test
+    # registered outside of it are written right away.
+    def log_summary(self, failure_cases, input_file):
+        self.failure_sink.write(failure_cases, input_file)
+        if not self.verifying:
+            self.failure_sink.close()
+        checks = failure_cases.assign(check=failure_cases["check"].astype(str)) \
+            .groupby("check", sort=False)["failure_case"]
+        with open(self.log_file_name, "a+") as log_file:
+            log_file.write(f"Errors for file:{input_file}\n")
+            for check, count, first in zip(checks.size().index, checks.size(), checks.first()):
+                example = str(first)
+                if len(example) > 300:
+                    example = example[:300] + "..."
+                log_file.write(f"{check}: {count} failure(s), e.g.\n {example}\n")
+            log_file.write(f"All failure cases are in {os.path.abspath(self.failure_sink.path)}")
+            log_file.write("\n========================\n")
+
+    def register_for_test(self, scheme, input_file, chunk_size=None, mode=None):
+        if self.planning:
+            self.planned.append((scheme, input_file))
+            return
+        if mode is not None:
+            self.mode = mode.start()
+        if self.stopped or self.out_of_time(input_file):
+            return
+        fingerprint = None
+        if self.manifest is not None:
+            fingerprint = self.manifest.fingerprint(self.input_dir, scheme, input_file,
+                                                    scheme_reads(scheme))
+            cached = self.manifest.lookup(scheme, input_file, fingerprint)
+            if cached is not None:
+                # Nothing changed since the previous run, log its failures again
+                self.log_collected([(scheme, input_file)], [cached])
+                return
+        rows = None
+        if fingerprint is not None and config.row_delta and not (chunk_size or config.chunk_size):
+            rows = self.delta_rows(scheme, input_file, fingerprint)
+        self.recording = []
+        try:
+            with self.activate():
+                self.validate_file(scheme, input_file, chunk_size or config.chunk_size, rows)
+            if fingerprint is not None and self.mode.collects_all \
+                    and not self.stopped and not self.mode.expired():
+                self.manifest.record(scheme, input_file, fingerprint, self.recording)
+                if config.row_delta:
+                    self.save_row_snapshots(fingerprint)
+        finally:
+            self.recording = None
+
+    # Returns the positions of the rows of input_file that changed since the
+    # previous run, together with the rows whose referenced keys (see
+    # row_delta.scheme_references) changed in other files. Returns None when
+    # the whole file has to be validated: the previous run of the task did not
+    # pass, the scheme changed, has dynamic columns, validates a matrix file
+    # (see validate_matrix) or opted out of row delta,
+    # the first row changed, or another file the scheme reads changed in a way
+    # that cannot be traced to rows through its references.
+    def delta_rows(self, scheme, input_file, fingerprint):
+        entry = self.manifest.tasks.get(Manifest.task_key(scheme, input_file))
+        if entry is None or not entry["passed"] or schema_cache.is_dynamic(scheme) \
+                or not row_delta.supports_row_delta(scheme) or hasattr(scheme, 'matrix_rules') \
+                or entry["fingerprint"]["scheme"] != fingerprint["scheme"]:
+            return None
+        previous = entry["fingerprint"]["files"]
+        references = row_delta.scheme_references(scheme)
+        referenced_files = {config.key_indexes[index_name][0] for index_name in references.values()}
+        for file in scheme_reads(scheme):
+            if file not in referenced_files and previous.get(file) != fingerprint["files"].get(file):
+                return None
+        delta = self.file_delta(input_file, previous.get(input_file))
+        if delta is None or delta.first_row_changed:
+            return None
+        df = self.load_file(input_file, scheme)
+        rows = [delta.changed_rows]
+        for column, index_name in references.items():
+            file, _ = config.key_indexes[index_name]
+            if file not in fingerprint["files"]:
+                return None
+            if previous.get(file) == fingerprint["files"][file]:
+                continue
+            referenced = self.file_delta(file, previous.get(file))
+            if referenced is None:
+                return None
+            rows.append(np.flatnonzero(df[column].isin(referenced.keys(index_name))))
+        return np.unique(np.concatenate(rows))
+
+    # Returns the FileDelta of a file against the version with the given content hash
+    def file_delta(self, file, previous_hash):
+        key = (file, previous_hash)
+        if key not in self.deltas:
+            snapshot = self.row_snapshots.load(self.input_dir, file, previous_hash) \
+                if previous_hash else None
+            delta = None
+            if snapshot is not None:
+                df = self.load_file(file)
+                delta = row_delta.FileDelta(snapshot, df, self.row_hashes(file, df))
+            self.deltas[key] = delta
+        return self.deltas[key]
+
+    def row_hashes(self, file, df):
+        cached = self.hashed_rows.get(file)
+        if cached is None or cached[0]() is not df:
+            cached = (weakref.ref(df), row_delta.row_hashes(df))
+            self.hashed_rows[file] = cached
+        return cached[1]
+
+    # Saves the row snapshots of the files of a recorded task, the next run diffs against them
+    def save_row_snapshots(self, fingerprint):
+        for file, content_hash in fingerprint["files"].items():
+            if not file.endswith(".csv") or content_hash is None \
+                    or (file, content_hash) in self.saved_snapshots:
+                continue
+            df = self.load_file(file)
+            self.row_snapshots.save(self.input_dir, file, df, self.row_hashes(file, df), content_hash)
+            self.saved_snapshots.add((file, content_hash))
+
+    # Validates df with the scheme in the current validation mode and returns
+    # its failure cases, None if df is valid
+    def run_scheme(self, scheme, df):
+        try:
+            scheme.validate(df, lazy=self.mode.lazy)
+        except pa.errors.SchemaErrors as err:
+            return err.failure_cases
+        except pa.errors.SchemaError as err:
+            # Raised instead of SchemaErrors when validating fail fast
+            check = getattr(err.check, "name", None) or str(err.reason_code)
+            return pd.DataFrame({"schema_context": [type(err.schema).__name__],
+                                 "column": [getattr(err.schema, "name", None)],
+                                 "check": [check],
+                                 "check_number": [None],
+                                 "failure_case": [str(err)],
+                                 "index": [None]})
+        return None
+
+    # rows are the positions of the only rows to validate, None validates all of them
+    def validate_file(self, scheme, input_file, chunk_size=None, rows=None):
+        if hasattr(scheme, 'matrix_rules'):
+            # rows is always None here, matrix files are not validated by row delta
+            self.validate_matrix(scheme, input_file, chunk_size)
+            return
+        if chunk_size:
+            self.stream_for_test(scheme, input_file, chunk_size)
+            return
+        df = self.load_file(input_file, scheme)
         for key, value in scheme.__dict__.items():
             print(key, ":", value)
-        if hasattr(scheme, 'with_dynamic_columns'):
-            scheme = scheme.with_dynamic_columns_old(df)
-            for key, value in scheme.__dict__.items():
-                print(key, ":", value)
+        if schema_cache.is_dynamic(scheme):
+            scheme = schema_cache.dynamic_schema(scheme, df)
+        if rows is not None:
+            if len(rows) == 0:
+                return
+            # Checks that need the first row or the whole file read it from self.stream
+            self.stream = streaming.StreamState(df)
+            self.stream.first_row = df.iloc[0]
+            df = df.iloc[rows]
         try:
-            scheme.validate(df, lazy=config.lazy)
-        except pa.errors.SchemaErrors as err:
-            print(str(err.failure_cases))  # dataframe of schema errors
-            self.log_errors(err.failure_cases, input_file)
+            failure_cases = self.run_scheme(scheme, df)
+        finally:
+            self.stream = None
+        if failure_cases is not None:
+            print(str(failure_cases))  # dataframe of schema errors
+            self.report_failures(failure_cases, input_file)
             #for index, failure in enumerate(err.failure_cases['failure_case'],start=1):
                 #print("Error number:%s"%index)
                 #log_errors(err.failure_cases)
                 #print(err.data)  # invalid dataframe
 
+    def report_failures(self, failure_cases, input_file):
+        self.log_errors(failure_cases, input_file)
+        if self.mode.stops_at_first_failure:
+            self.stop("Validation stopped at the first failure")
+
+    # Validates a day x zone matrix file (e.g. conflicts.csv) as one NumPy array
+    # against the rules of scheme.matrix_rules() instead of through pandera.
+    # With chunk_size the file is read and checked chunk by chunk, otherwise as
+    # a whole, memory-mapped from the cache with config.matrix_mmap. The rules
+    # may depend on other files (sim_period.csv, simsettings.yml), if these
+    # cannot be read that is reported as the failure of the file.
+    def validate_matrix(self, scheme, input_file, chunk_size=None):
+        path = os.path.join(self.input_dir, input_file)
+        try:
+            rules = scheme.matrix_rules()
+        except (OSError, KeyError, ValueError) as err:
+            self.report_failures(streaming.dataframe_failure_cases(
+                "matrix_rules", [f"The rules for {input_file} could not be read: {type(err).__name__}: {err}"]), input_file)
+            return
+        if not chunk_size:
+            matrix = Matrix.load(path, os.path.join(config.cache_dir, "matrices")
+                                 if config.matrix_mmap else None)
+            failure_cases = matrix.failure_cases(rules)
+            if failure_cases is not None:
+                self.report_failures(failure_cases, input_file)
+            return
+        failures = []
+        offset, previous_day = 0, np.nan
+        for matrix in Matrix.read_chunks(path, chunk_size):
+            failure_cases = matrix.failure_cases(rules, offset, previous_day)
+            if failure_cases is not None:
+                failures.append(failure_cases)
+                if self.mode.stops_at_first_failure:
+                    break
+            if self.mode.expired():
+                break
+            offset += len(matrix.days)
+            previous_day = matrix.days[-1]
+        if failures:
+            self.report_failures(pd.concat(failures, ignore_index=True), input_file)
+
+    # Runs check(whole_file, rows) for a check that compares the rows of df with
+    # the rest of the file, where rows are the labels of df. df only holds part
+    # of the file when it is validated in chunks or by row delta: in chunks the
+    # given columns are kept and the check runs once all chunks are read, with
+    # every row (see StreamState.whole_file).
+    def check_whole_file(self, name, df, columns, check):
+        if self.stream is None:
+            return check(df, df.index)
+        whole_file = self.stream.whole_file(name, df, columns,
+                                            lambda whole_file: check(whole_file, whole_file.index))
+        if whole_file is None:
+            return pd.Series(True, index=df.index)
+        return check(whole_file, df.index)
+
+    # Validates a file chunk by chunk so that it never has to be in memory at once.
+    # Checks that need the whole file read the first row and their accumulators
+    # from self.stream, the accumulated failures are reported after the last chunk.
+    def stream_for_test(self, scheme, input_file, chunk_size):
+        self.stream = streaming.StreamState()
+        failures = []
+        try:
+            for chunk in self.read_chunks(input_file, chunk_size, scheme):
+                if self.stream.first_row is None:
+                    self.stream.first_row = chunk.iloc[0]
+                    if schema_cache.is_dynamic(scheme):
+                        scheme = schema_cache.dynamic_schema(scheme, chunk)
+                failure_cases = self.run_scheme(scheme, chunk)
+                if failure_cases is not None:
+                    failures.append(failure_cases)
+                    if self.mode.stops_at_first_failure:
+                        break
+                if self.mode.expired():
+                    break
+            else:
+                accumulated = self.stream.failure_cases()
+                if accumulated is not None:
+                    failures.append(accumulated)
+        finally:
+            self.stream = None
+        if failures:
+            failure_cases = pd.concat(failures, ignore_index=True)
+            print(str(failure_cases))
+            self.log_errors(failure_cases, input_file)
+            if self.mode.stops_at_first_failure:
+                self.stop("Validation stopped at the first failure")
+
 
 
     # Transposes a given dataframe
@@ -99,4 +673,53 @@ class FabGuard():
         df.columns = df.iloc[0]
         df = df[1:].reset_index(drop=True)
         # reset the datatype from objevct to int
-        return df
\ No newline at end of file
+        return df
+
+
+# The FrameCache variant of a file read for the scheme with the given read_csv arguments
+def _read_variant(scheme=None, kwargss=None):
+    scheme_name = None if scheme is None else f"{scheme.__module__}.{scheme.__qualname__}"
+    return scheme_name, repr(sorted((kwargss or {}).items()))
+
+
+# Yields the cached result of every task, or the next result from results for the tasks without one
+def _merge_results(cached, results):
+    results = iter(results)
+    for result in cached:
+        yield result if result is not None else next(results)
+
+
+# Frames loaded by a worker process, kept for all tasks the worker runs
+_worker_files = None
+
+def _validate_in_worker(input_dir, scheme, input_file, chunk_size, mode):
+    global _worker_files
+    if _worker_files is None:
+        _worker_files = FrameCache(config.max_cache_bytes)
+    guard = FabGuard(input_dir, _worker_files, worker=True)
+    guard.register_for_test(scheme, input_file, chunk_size, mode)
+    return guard.collected
+
+
+# The log directory of input_dir when it is validated next to siblings that
+# would otherwise share the logs in their parent directory
+def sibling_log_dir(input_dir):
+    parent = os.path.abspath(os.path.join(input_dir, '..'))
+    return os.path.join(parent, config.log_dirs, os.path.basename(os.path.normpath(input_dir)))
+
+
+# Validates several input directories at the same time, each with its own
+# FabGuard instance. All instances share one frame cache.
+def verify_dirs(input_dirs, workers=None):
+    loaded_files = FrameCache(config.max_cache_bytes)
+    # Directories with the same parent would share the logs there, each of
+    # them logs to its own directory under the parent instead
+    parents = collections.Counter(os.path.abspath(os.path.join(input_dir, '..'))
+                                  for input_dir in input_dirs)
+    def verify_dir(input_dir):
+        log_dir = None
+        if parents[os.path.abspath(os.path.join(input_dir, '..'))] > 1:
+            log_dir = sibling_log_dir(input_dir)
+        FabGuard(input_dir, loaded_files, log_dir=log_dir).verify()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(verify_dir, input_dirs))
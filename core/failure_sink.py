@@ -0,0 +1,73 @@
+import os
+
+import pandas as pd
+
+# pyarrow is optional, without it failures are written as JSON lines only
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pq = None
+
+columns = ["input_dir", "file", "check", "column", "index", "failure_case"]
+
+
+# Structured log of every failure case of a validation run, next to the text
+# log that only gets a summary per file (see FabGuard.log_errors). Failure
+# frames are buffered and written in bulk, either as JSON lines (.jsonl) or
+# as row groups of one Parquet file (.parquet), with one record per failure:
+# input_dir, file, check, column, index (row) and failure_case (the value, as text).
+class FailureSink():
+    def __init__(self, path, input_dir=None, buffer_rows=100000):
+        self.path = path
+        self.input_dir = input_dir
+        self.parquet = path.endswith(".parquet") and pq is not None
+        if path.endswith(".parquet") and pq is None:
+            self.path = path[:-len(".parquet")] + ".jsonl"
+        self.buffer_rows = buffer_rows
+        self.buffer = []
+        self.buffered = 0
+        self.writer = None
+        # Every run starts a new file
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def write(self, failure_cases, input_file):
+        records = pd.DataFrame({
+            "input_dir": self.input_dir,
+            "file": input_file,
+            "check": failure_cases["check"].astype(str) if "check" in failure_cases else None,
+            "column": failure_cases["column"].astype(str) if "column" in failure_cases else None,
+            "index": failure_cases["index"].astype(str) if "index" in failure_cases else None,
+            "failure_case": failure_cases["failure_case"].astype(str)},
+            columns=columns)
+        self.buffer.append(records)
+        self.buffered += len(records)
+        if self.buffered >= self.buffer_rows:
+            self.flush()
+
+    def flush(self):
+        if not self.buffer:
+            return
+        records = pd.concat(self.buffer, ignore_index=True)
+        self.buffer = []
+        self.buffered = 0
+        if self.parquet:
+            table = pa.Table.from_pandas(records, preserve_index=False)
+            if self.writer is None:
+                # A closed Parquet file cannot be appended to, it is rewritten
+                # with the failures that were written before it was closed
+                written = pq.read_table(self.path) if os.path.exists(self.path) else None
+                self.writer = pq.ParquetWriter(self.path, table.schema)
+                if written is not None:
+                    self.writer.write_table(written)
+            self.writer.write_table(table)
+        else:
+            with open(self.path, "a") as failure_file:
+                records.to_json(failure_file, orient="records", lines=True)
+
+    def close(self):
+        self.flush()
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
@@ -0,0 +1,95 @@
+import os
+import threading
+from collections import OrderedDict
+
+
+# Cache of loaded dataframes keyed by the resolved path of a file, its mtime
+# and the variant it was read as: the same file read with the types and
+# columns of different schemes gives different frames (see FabGuard.load_file).
+# The cache holds at most max_bytes worth of frames (None means unbounded) and
+# evicts the least recently used frames first, so that long running batch
+# validations over many input directories do not keep every file in memory.
+class FrameCache():
+    def __init__(self, max_bytes=None):
+        self.max_bytes = max_bytes
+        self.frames = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.RLock()
+
+    # Returns the cache key for the current version of the file, None if it does not exist
+    @staticmethod
+    def key(path, variant=None):
+        path = os.path.realpath(path)
+        try:
+            return path, os.stat(path).st_mtime_ns, variant
+        except FileNotFoundError:
+            return None
+
+    def __contains__(self, path):
+        return self.contains(path)
+
+    def contains(self, path, variant=None):
+        with self.lock:
+            return self.key(path, variant) in self.frames
+
+    def __len__(self):
+        return len(self.frames)
+
+    # Returns the cached dataframe for the file or None if the file was not
+    # loaded yet or changed since it was loaded
+    def get(self, path, variant=None):
+        key = self.key(path, variant)
+        with self.lock:
+            if key not in self.frames:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.frames.move_to_end(key)
+            return self.frames[key][0]
+
+    # The frames of the current version of the file, with the variants they were read as
+    def variants(self, path):
+        key = self.key(path)
+        if key is None:
+            return []
+        with self.lock:
+            return [(k[2], df) for k, (df, _) in self.frames.items() if k[:2] == key[:2]]
+
+    # A frame can be cached under several variants of the file, its memory is
+    # counted once and it leaves the cache under all of them at the same time
+    def put(self, path, df, variant=None):
+        key = self.key(path, variant)
+        if key is None:
+            return
+        with self.lock:
+            shared = any(k[:2] == key[:2] and k != key and entry[0] is df
+                         for k, entry in self.frames.items())
+        nbytes = 0 if shared else int(df.memory_usage(index=True, deep=True).sum())
+        with self.lock:
+            # Frames of older versions of the same file are stale, whatever they were read as
+            for old_key in [k for k in self.frames
+                            if k[0] == key[0] and (k[1] != key[1] or k[2] == key[2])]:
+                self._remove(old_key)
+            self.frames[key] = (df, nbytes)
+            self.size += nbytes
+            # Evict the least recently used frames, but always keep the newest one
+            while self.max_bytes is not None and self.size > self.max_bytes \
+                    and len(self.frames) > 1:
+                self._remove(next(iter(self.frames)))
+
+    def _remove(self, key):
+        df, nbytes = self.frames.pop(key)
+        self.size -= nbytes
+        for other in [k for k, entry in self.frames.items() if k[0] == key[0] and entry[0] is df]:
+            self.size -= self.frames.pop(other)[1]
+
+    def clear(self):
+        with self.lock:
+            self.frames.clear()
+            self.size = 0
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses,
+                "entries": len(self.frames), "bytes": self.size}
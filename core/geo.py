@@ -0,0 +1,105 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+
+# Mean radius of the earth in km
+EARTH_RADIUS_KM = 6371.0088
+
+
+# Great-circle distance in km between the points (lat1, lon1) and (lat2, lon2),
+# all given in degrees as arrays of the same length
+def haversine(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(values, dtype="float64"))
+                              for values in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 \
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+# Positions in locations of the given names, -1 for names that are not
+# locations. A name that appears twice is resolved to its first location.
+def location_positions(locations, names):
+    location_names = pd.Index(locations["name"])
+    first = ~location_names.duplicated()
+    found = location_names[first].get_indexer(names)
+    return np.where(found < 0, -1, np.flatnonzero(first)[found])
+
+
+# Great-circle distance of every route between its two locations, NaN for
+# routes whose locations are unknown or have no coordinates
+def route_great_circle(routes, locations):
+    lat = locations["lat"].to_numpy(dtype="float64", na_value=np.nan)
+    lon = locations["lon"].to_numpy(dtype="float64", na_value=np.nan)
+    first = location_positions(locations, routes["name1"])
+    second = location_positions(locations, routes["name2"])
+    known = (first >= 0) & (second >= 0)
+    distances = np.full(len(routes), np.nan)
+    distances[known] = haversine(lat[first[known]], lon[first[known]],
+                                 lat[second[known]], lon[second[known]])
+    return distances
+
+
+# Mask of the routes whose distance disagrees with the great-circle distance
+# between their locations: a route can not be shorter than the great circle
+# (by more than tolerance of it and slack_km), nor longer than max_detour times it
+def route_distance_mismatches(routes, locations, tolerance, max_detour, slack_km):
+    great_circle = route_great_circle(routes, locations)
+    distance = pd.to_numeric(routes["distance"], errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+    with np.errstate(invalid="ignore"):
+        too_short = distance < great_circle * (1 - tolerance) - slack_km
+        too_long = distance > great_circle * max_detour + slack_km
+    return pd.Series(too_short | too_long, index=routes.index), great_circle
+
+
+# Unit vectors of the points on the sphere, distances between them are chords
+def _unit_vectors(lat, lon):
+    lat = np.radians(np.asarray(lat, dtype="float64"))
+    lon = np.radians(np.asarray(lon, dtype="float64"))
+    return np.column_stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)])
+
+
+# All pairs (i, j), i < j, of points closer than radius_km to each other, with
+# their distances. The points are put in a grid of cubes of the size of the
+# radius on their unit vectors, so only points in neighbouring cubes are
+# compared and the cost grows with the number of points, not its square.
+def near_duplicate_pairs(lat, lon, radius_km):
+    lat = np.asarray(lat, dtype="float64")
+    lon = np.asarray(lon, dtype="float64")
+    valid = np.flatnonzero(~np.isnan(lat) & ~np.isnan(lon))
+    lat, lon = lat[valid], lon[valid]
+    points = _unit_vectors(lat, lon)
+    # A chord is at most as long as the arc; cubes smaller than about 10 m would
+    # overflow the cell codes, larger cubes only add candidates
+    chord = 2 * np.sin(min(radius_km / EARTH_RADIUS_KM, np.pi) / 2)
+    cell_size = max(chord, 1e-6)
+    cells = np.floor(points / cell_size).astype("int64")
+    cells -= cells.min(axis=0, initial=0) - 1
+    sizes = cells.max(axis=0, initial=0) + 2
+    codes = (cells[:, 0] * sizes[1] + cells[:, 1]) * sizes[2] + cells[:, 2]
+    order = np.argsort(codes, kind="stable")
+    sorted_codes = codes[order]
+
+    # Every pair of neighbouring cubes is visited once: the cube itself and the
+    # 13 neighbours that come after it in (dx, dy, dz) order
+    firsts, seconds = [], []
+    for dx, dy, dz in itertools.product((-1, 0, 1), repeat=3):
+        if (dx, dy, dz) < (0, 0, 0):
+            continue
+        neighbours = codes + (dx * sizes[1] + dy) * sizes[2] + dz
+        start = np.searchsorted(sorted_codes, neighbours, side="left")
+        counts = np.searchsorted(sorted_codes, neighbours, side="right") - start
+        first = np.repeat(np.arange(len(codes)), counts)
+        # Position of every candidate within the run of its neighbour cube
+        offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        second = order[np.repeat(start, counts) + offsets]
+        if (dx, dy, dz) == (0, 0, 0):
+            keep = first < second
+            first, second = first[keep], second[keep]
+        firsts.append(np.minimum(first, second))
+        seconds.append(np.maximum(first, second))
+    first = np.concatenate(firsts)
+    second = np.concatenate(seconds)
+    distances = haversine(lat[first], lon[first], lat[second], lon[second])
+    close = distances <= radius_km
+    return valid[first[close]], valid[second[close]], distances[close]
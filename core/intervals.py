@@ -0,0 +1,27 @@
+import numpy as np
+import pandas as pd
+
+
+# One sweep over the intervals [starts[i], ends[i]] (in days, both inclusive)
+# grouped by keys: the intervals are sorted by key and start, and each one is
+# compared with the latest end of the intervals of its key that start before
+# it. Returns the positions of the intervals that overlap an earlier interval
+# of their key. Intervals with a missing start or end are left out.
+def interval_sweep(keys, starts, ends):
+    keys = np.asarray(keys)
+    starts = np.asarray(starts, dtype="float64")
+    ends = np.asarray(ends, dtype="float64")
+    positions = np.flatnonzero(~np.isnan(starts) & ~np.isnan(ends))
+    positions = positions[np.lexsort((starts[positions], keys[positions]))]
+    keys, starts, ends = keys[positions], starts[positions], ends[positions]
+
+    first_of_key = np.ones(len(keys), dtype=bool)
+    first_of_key[1:] = keys[1:] != keys[:-1]
+    latest_end = pd.Series(ends).groupby(np.cumsum(first_of_key)).cummax().to_numpy()
+    previous_end = np.full(len(keys), np.nan)
+    previous_end[1:] = latest_end[:-1]
+    previous_end[first_of_key] = np.nan
+
+    with np.errstate(invalid="ignore"):
+        overlapping = starts <= previous_end
+    return positions[overlapping]
@@ -0,0 +1,41 @@
+import os
+import threading
+import weakref
+
+import pandas as pd
+
+import config
+
+
+# Hash indexes (pandas Index) of the distinct values in key columns of the input
+# files, shared by all schemas that validate one input directory. Named indexes
+# are declared in config.key_indexes, e.g. "locations.country". An index is
+# built the first time a schema asks for it and again only when its file is
+# reloaded, i.e. when the frame cache returns a different frame for the file.
+class KeyIndexes():
+    def __init__(self, guard):
+        self.guard = guard
+        self.indexes = {}
+        self.lock = threading.Lock()
+
+    # Returns the index declared under name in config.key_indexes
+    def get(self, name):
+        if name not in config.key_indexes:
+            raise KeyError(f"Unknown key index {name}, declare it in config.key_indexes")
+        file, columns = config.key_indexes[name]
+        return self.build(file, *columns)
+
+    # Returns the index of the distinct values in the given columns of a file
+    def build(self, file, *columns):
+        df = self.guard.load_file(file)
+        key = (os.path.join(self.guard.input_dir, file), columns)
+        with self.lock:
+            cached = self.indexes.get(key)
+        if cached is not None and cached[0]() is df:
+            return cached[1]
+        values = pd.concat([df[column] for column in columns], ignore_index=True)
+        index = pd.Index(values.unique())
+        with self.lock:
+            # Only a weak reference to the frame is kept, so that the frame cache can still evict it
+            self.indexes[key] = (weakref.ref(df), index)
+        return index
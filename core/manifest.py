@@ -0,0 +1,147 @@
+import hashlib
+import io
+import json
+import os
+import sys
+import tempfile
+import types
+
+import pandas as pd
+
+from columnar_cache import ColumnarCache
+
+
+# Manifest of previous validation runs of an input directory, used to validate
+# only what changed since (see FabGuard.verify with incremental=True).
+#
+# For every (scheme, input_file) task it keeps a fingerprint, made of a hash of
+# the rules of the scheme (see scheme_hash) and the hashes of the validated file
+# and the files the scheme reads, together with the failures the task produced. A task whose
+# fingerprint did not change is not validated again, its stored failures are
+# logged instead. File hashes are only recomputed when a file's size or mtime changed.
+class Manifest():
+    def __init__(self, path):
+        self.path = path
+        self.files = {}
+        self.tasks = {}
+        if os.path.isfile(path):
+            with open(path) as manifest_file:
+                data = json.load(manifest_file)
+            self.files = data.get("files", {})
+            self.tasks = data.get("tasks", {})
+
+    def file_hash(self, input_dir, file):
+        path = os.path.abspath(os.path.join(input_dir, file))
+        if not os.path.isfile(path):
+            return None
+        stat = os.stat(path)
+        entry = self.files.get(path)
+        if entry is None or entry["size"] != stat.st_size or entry["mtime_ns"] != stat.st_mtime_ns:
+            entry = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns,
+                     "hash": ColumnarCache.content_hash(path)}
+            self.files[path] = entry
+        return entry["hash"]
+
+    # Hash of the rules the scheme validates with: the source of the modules that
+    # define the scheme and its base schemes and of the modules of this package
+    # they use (helpers such as geo or intervals, and the modules these use),
+    # and the current values of the config, e.g. the tolerances of the checks
+    @staticmethod
+    def scheme_hash(scheme):
+        digest = hashlib.blake2b(digest_size=16)
+        names = dict.fromkeys(cls.__module__ for cls in scheme.__mro__
+                              if hasattr(cls, 'to_schema') and not cls.__module__.startswith("pandera"))
+        modules = _scheme_modules.get(tuple(names))
+        if modules is None:
+            modules = package_modules(sys.modules.get(name) for name in names)
+            _scheme_modules[tuple(names)] = modules
+        sources = sorted({os.path.realpath(module.__file__) for module in modules
+                          if os.path.basename(module.__file__) != "config.py"})
+        for source in sources:
+            digest.update(source_hash(source).encode())
+        # The config may be imported under more than one name, each with its own values
+        configs = sorted(config_values(module) for module in modules
+                         if os.path.basename(module.__file__) == "config.py")
+        for values in configs:
+            digest.update(values.encode())
+        return digest.hexdigest()
+
+    @staticmethod
+    def task_key(scheme, input_file):
+        return f"{scheme.__module__}.{scheme.__qualname__}:{input_file}"
+
+    def fingerprint(self, input_dir, scheme, input_file, reads):
+        return {"scheme": self.scheme_hash(scheme),
+                "files": {file: self.file_hash(input_dir, file)
+                          for file in [input_file] + list(reads)}}
+
+    # Returns the stored failures of the task as (failure_cases, input_file)
+    # pairs if its fingerprint did not change, None otherwise
+    def lookup(self, scheme, input_file, fingerprint):
+        entry = self.tasks.get(self.task_key(scheme, input_file))
+        if entry is None or entry["fingerprint"] != fingerprint:
+            return None
+        return [(pd.read_json(io.StringIO(failure_cases), orient="table"), failed_file)
+                for failure_cases, failed_file in entry["failures"]]
+
+    def record(self, scheme, input_file, fingerprint, failures):
+        self.tasks[self.task_key(scheme, input_file)] = {
+            "fingerprint": fingerprint,
+            "passed": not failures,
+            "failures": [(failure_cases.astype(str).to_json(orient="table", index=False), failed_file)
+                         for failure_cases, failed_file in failures]}
+
+    def save(self):
+        # A temporary file of its own for every writer, threads may save at the same time
+        descriptor, tmp_path = tempfile.mkstemp(prefix=os.path.basename(self.path) + ".",
+                                                suffix=".tmp", dir=os.path.dirname(self.path) or ".")
+        with os.fdopen(descriptor, "w") as manifest_file:
+            json.dump({"files": self.files, "tasks": self.tasks}, manifest_file)
+        os.replace(tmp_path, self.path)
+
+
+_package_dir = os.path.dirname(os.path.realpath(__file__))
+# The package modules of every scheme, and the hash of every source file by its mtime
+_scheme_modules = {}
+_source_hashes = {}
+
+
+def _in_package(module):
+    source = getattr(module, "__file__", None)
+    return source is not None and os.path.realpath(source).startswith(_package_dir + os.sep)
+
+
+# The modules of this package among the given modules and the ones they use,
+# by importing them or names defined in them, directly or through each other
+def package_modules(modules):
+    found = {}
+    pending = [module for module in modules if module is not None]
+    while pending:
+        module = pending.pop()
+        if id(module) in found or not _in_package(module):
+            continue
+        found[id(module)] = module
+        for value in vars(module).values():
+            if isinstance(value, types.ModuleType):
+                pending.append(value)
+                continue
+            owner = getattr(value, "__module__", None)
+            if isinstance(owner, str) and owner in sys.modules:
+                pending.append(sys.modules[owner])
+    return list(found.values())
+
+
+# The public settings of a config module, as text
+def config_values(module):
+    return repr(sorted((name, repr(value)) for name, value in vars(module).items()
+                       if not name.startswith("_") and not isinstance(value, types.ModuleType)
+                       and not callable(value)))
+
+
+def source_hash(path):
+    mtime = os.stat(path).st_mtime_ns
+    cached = _source_hashes.get(path)
+    if cached is None or cached[0] != mtime:
+        cached = (mtime, ColumnarCache.content_hash(path))
+        _source_hashes[path] = cached
+    return cached[1]
@@ -0,0 +1,135 @@
+import hashlib
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from columnar_cache import ColumnarCache
+import schema_hints
+
+
+# Rules for a day x zone matrix file such as conflicts.csv or flood_level.csv:
+# the first column holds the day, every other column the values of one zone.
+#  - the days must be whole numbers that start at first_day and go up by one,
+#    and may not go beyond last_day,
+#  - the values must lie between min_value and max_value, and be whole numbers
+#    when integer is set.
+class MatrixRules():
+    def __init__(self, min_value=None, max_value=None, integer=False,
+                 first_day=0, last_day=None):
+        self.min_value = min_value
+        self.max_value = max_value
+        self.integer = integer
+        self.first_day = first_day
+        self.last_day = last_day
+
+
+# A matrix file as one C-contiguous float64 array of values (days x zones),
+# with its day column and zone names
+class Matrix():
+    def __init__(self, days, zones, values):
+        self.days = days
+        self.zones = zones
+        self.values = values
+
+    @classmethod
+    def from_frame(cls, df):
+        block = df.iloc[:, 1:]
+        if not all(pd.api.types.is_numeric_dtype(dtype) for dtype in block.dtypes):
+            block = block.apply(pd.to_numeric, errors="coerce")
+        days = pd.to_numeric(df.iloc[:, 0], errors="coerce")
+        return cls(days.to_numpy(dtype="float64", na_value=np.nan),
+                   [schema_hints.clean_column_name(str(zone)) for zone in block.columns],
+                   np.ascontiguousarray(block.to_numpy(dtype="float64", na_value=np.nan)))
+
+    # Reads a matrix file. With cache_dir, the parsed array is kept there as a
+    # .npy file per file version and memory-mapped on later reads, so that a
+    # large matrix is neither parsed nor copied into memory again.
+    @classmethod
+    def load(cls, path, cache_dir=None):
+        if cache_dir is None:
+            return cls.from_frame(cls.read_csv(path))
+        prefix = "matrix-" + hashlib.blake2b(os.path.abspath(path).encode(), digest_size=8).hexdigest()
+        entry = os.path.join(cache_dir, f"{prefix}-{ColumnarCache.content_hash(path)}")
+        if not os.path.isfile(f"{entry}.npy"):
+            matrix = cls.from_frame(cls.read_csv(path))
+            os.makedirs(cache_dir, exist_ok=True)
+            # Drop the entries of older versions of the same file
+            for name in os.listdir(cache_dir):
+                if name.startswith(prefix) and not name.startswith(os.path.basename(entry)):
+                    try:
+                        os.remove(os.path.join(cache_dir, name))
+                    except FileNotFoundError:
+                        pass
+            with open(f"{entry}.zones", "w") as zones_file:
+                zones_file.write("\n".join(matrix.zones))
+            np.save(f"{entry}.days.npy", matrix.days)
+            # The values are written last, their file marks a complete entry
+            descriptor, tmp_path = tempfile.mkstemp(prefix=os.path.basename(entry) + ".",
+                                                    suffix=".tmp", dir=cache_dir)
+            with os.fdopen(descriptor, "wb") as values_file:
+                np.save(values_file, matrix.values)
+            os.replace(tmp_path, f"{entry}.npy")
+        with open(f"{entry}.zones") as zones_file:
+            zones = zones_file.read().split("\n")
+        return cls(np.load(f"{entry}.days.npy"), zones, np.load(f"{entry}.npy", mmap_mode="r"))
+
+    @staticmethod
+    def read_csv(path):
+        return pd.read_csv(path, engine="pyarrow") if schema_hints.pyarrow_available else pd.read_csv(path)
+
+    # Reads a matrix file as one matrix per chunk of chunk_size days
+    @classmethod
+    def read_chunks(cls, path, chunk_size):
+        for chunk in pd.read_csv(path, chunksize=chunk_size):
+            yield cls.from_frame(chunk)
+
+    # Failure cases of the rules, one row per violation with its day and zone,
+    # in the format of pandera's SchemaErrors.failure_cases. A matrix that holds
+    # one chunk of a file is checked with offset, the row of the file it starts
+    # at, and previous_day, the last day of the chunk before it.
+    def failure_cases(self, rules, offset=0, previous_day=np.nan):
+        cases = [self.day_failure_cases(rules, offset, previous_day)]
+        values = self.values
+        with np.errstate(invalid="ignore"):
+            checks = [("value_is_number", np.isnan(values))]
+            if rules.integer:
+                checks.append(("value_is_integer", np.mod(values, 1) != 0))
+            if rules.min_value is not None:
+                checks.append((f"greater_than_or_equal_to({rules.min_value})", values < rules.min_value))
+            if rules.max_value is not None:
+                checks.append((f"less_than_or_equal_to({rules.max_value})", values > rules.max_value))
+        for check, invalid in checks:
+            rows, zones = np.nonzero(invalid)
+            if len(rows) > 0:
+                cases.append(self._cases(check, rows, np.asarray(self.zones, dtype=object)[zones],
+                                         values[rows, zones], offset))
+        cases = [case for case in cases if case is not None]
+        return pd.concat(cases, ignore_index=True) if cases else None
+
+    def day_failure_cases(self, rules, offset=0, previous_day=np.nan):
+        days = self.days
+        expected = rules.first_day + offset + np.arange(len(days))
+        day_column = np.full(len(days), "Day", dtype=object)
+        cases = []
+        with np.errstate(invalid="ignore"):
+            checks = [("day_is_integer", np.isnan(days) | (np.mod(days, 1) != 0)),
+                      ("day_increasing", np.diff(np.r_[previous_day, days]) <= 0),
+                      ("day_sequence", days != expected)]
+            if rules.last_day is not None:
+                checks.append((f"day_less_than_or_equal_to({rules.last_day})", days > rules.last_day))
+        for check, invalid in checks:
+            rows = np.flatnonzero(invalid)
+            if len(rows) > 0:
+                cases.append(self._cases(check, rows, day_column[rows], days[rows], offset))
+        return pd.concat(cases, ignore_index=True) if cases else None
+
+    def _cases(self, check, rows, zones, values, offset=0):
+        return pd.DataFrame({"schema_context": "Column",
+                             "column": zones,
+                             "check": check,
+                             "check_number": None,
+                             "failure_case": values,
+                             "index": rows + offset,
+                             "day": self.days[rows]})
@@ -0,0 +1,84 @@
+import threading
+import weakref
+
+import numpy as np
+import pandas as pd
+
+from geo import location_positions
+
+
+# Labels the connected components of the graph with n nodes and the edges
+# (first[i], second[i]); nodes of one component get the same label, the
+# smallest node of the component. This is union-find done on whole arrays:
+# every round hooks the root of each edge's larger end under the root of its
+# smaller end, then compresses all paths, until no edge joins two roots.
+def connected_components(n, first, second):
+    parent = np.arange(n)
+    first = np.asarray(first)
+    second = np.asarray(second)
+    while True:
+        roots_first, roots_second = parent[first], parent[second]
+        joins = roots_first != roots_second
+        if not joins.any():
+            return parent
+        low = np.minimum(roots_first[joins], roots_second[joins])
+        high = np.maximum(roots_first[joins], roots_second[joins])
+        np.minimum.at(parent, high, low)
+        while True:
+            grandparent = parent[parent]
+            if np.array_equal(grandparent, parent):
+                break
+            parent = grandparent
+
+
+# The route network of an input directory: locations are the nodes, routes the
+# edges. Routes that name unknown locations are left out, other checks report them.
+class RouteNetwork():
+    def __init__(self, locations, routes):
+        self.locations = locations
+        first = location_positions(locations, routes["name1"])
+        second = location_positions(locations, routes["name2"])
+        known = (first >= 0) & (second >= 0)
+        first, second = first[known], second[known]
+        self.labels = connected_components(len(locations), first, second)
+        self.degree = np.bincount(np.concatenate([first, second]), minlength=len(locations))
+
+    # Positions of the locations of the given types
+    def of_type(self, location_types):
+        return np.flatnonzero(self.locations["location_type"].isin(location_types).to_numpy())
+
+    # Positions of the camps in a component without any conflict zone
+    def unreachable(self, camp_types, source_types):
+        sources = np.unique(self.labels[self.of_type(source_types)])
+        camps = self.of_type(camp_types)
+        return camps[~np.isin(self.labels[camps], sources)]
+
+    # Positions of the locations no route leads to
+    def isolated(self):
+        return np.flatnonzero(self.degree == 0)
+
+    # The components, largest first, as lists of positions of their locations.
+    # Isolated locations are left out.
+    def components(self):
+        connected = np.flatnonzero(self.degree > 0)
+        labels = self.labels[connected]
+        order = np.argsort(labels, kind="stable")
+        _, starts, sizes = np.unique(labels[order], return_index=True, return_counts=True)
+        components = np.split(connected[order], starts[1:])
+        return [components[i] for i in np.argsort(-sizes, kind="stable")]
+
+
+_last = None
+_lock = threading.Lock()
+
+
+# Returns the network of the given frames, the checks of one validation share it
+def route_network(locations, routes):
+    global _last
+    with _lock:
+        if _last is not None and _last[0]() is locations and _last[1]() is routes:
+            return _last[2]
+    network = RouteNetwork(locations, routes)
+    with _lock:
+        _last = (weakref.ref(locations), weakref.ref(routes), network)
+    return network
@@ -1,7 +1,7 @@
-import fab_guard
-from fab_guard import fgcheck
-import config as config
-from tests import *
+import plugins.FabFlee.fab_guard.fab_guard as fab_guard
+from plugins.FabFlee.fab_guard.fab_guard import fgcheck
+import plugins.FabFlee.fab_guard.config as config
+from plugins.FabFlee.fab_guard.tests import *
 
 
 @fgcheck
@@ -12,6 +12,17 @@ def test_all_files(self):
     # self.register_for_test(closures_scheme.ClosuresScheme, config.closures)
 
 
-print("Hello World")
-fg = fab_guard.FabGuard(config.input_file_dir)
-fg.verify()
\ No newline at end of file
+@fgcheck
+def test_route_network(self):
+    self.register_for_test(route_network_scheme.RouteNetworkScheme, config.routes)
+
+
+@fgcheck
+def test_demographic_files(self):
+    self.register_family_for_test(demographic_scheme.DemographicScheme, config.demograohic_files_pattern)
+
+
+if __name__ == "__main__":
+    print("Hello World")
+    fg = fab_guard.FabGuard(config.input_file_dir)
+    fg.verify()
@@ -0,0 +1,110 @@
+import hashlib
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+import config
+
+
+# Hash of every row of df, independent of the index
+def row_hashes(df):
+    return pd.util.hash_pandas_object(df, index=False).to_numpy()
+
+
+# Columns of the validated file whose values are looked up in the key index of
+# another file, as declared in the metadata of the scheme's Config, e.g.
+# metadata = {"references": {"name": "routes.names"}}
+def scheme_references(scheme):
+    metadata = getattr(scheme.Config, "metadata", None) or {}
+    return dict(metadata.get("references", {}))
+
+
+# Whether files validated with the scheme may be validated by their changed
+# rows only. Schemes whose checks judge the file as a whole, e.g. whether the
+# routes connect all locations, opt out with metadata = {"row_delta": False}.
+def supports_row_delta(scheme):
+    metadata = getattr(scheme.Config, "metadata", None) or {}
+    return metadata.get("row_delta", True)
+
+
+# Key columns of a file, as declared in config.key_indexes
+def key_columns(file):
+    columns = []
+    for index_file, index_columns in config.key_indexes.values():
+        if index_file == file:
+            columns.extend(column for column in index_columns if column not in columns)
+    return columns
+
+
+# Marks the rows of hashes that have no counterpart in other_hashes. Rows are
+# compared as a multiset: when a hash occurs n times in other_hashes, its first
+# n occurrences are matched and every further copy of the row counts as new.
+def _surplus(hashes, other_hashes):
+    hashes = pd.Series(hashes)
+    occurrence = hashes.groupby(hashes.to_numpy()).cumcount().to_numpy()
+    other_counts = hashes.map(pd.Series(other_hashes).value_counts()).fillna(0).to_numpy()
+    return occurrence >= other_counts
+
+
+# Difference between the version of a file validated by the previous run and
+# the current one. changed_rows holds the positions of the rows of the current
+# frame that did not exist in the previous version, including added copies of
+# existing rows, and changed_keys the values of the key columns in rows that
+# were added or removed.
+class FileDelta():
+    def __init__(self, snapshot, df, hashes):
+        old_hashes = snapshot["row_hash"].to_numpy()
+        added = _surplus(hashes, old_hashes)
+        removed = _surplus(old_hashes, hashes)
+        self.changed_rows = np.flatnonzero(added)
+        self.first_row_changed = len(hashes) == 0 or len(old_hashes) == 0 \
+            or hashes[0] != old_hashes[0]
+        self.changed_keys = {}
+        for column in snapshot.columns.drop("row_hash"):
+            if column in df.columns:
+                keys = pd.concat([df[column][added], snapshot[column][removed]], ignore_index=True)
+                self.changed_keys[column] = pd.Index(keys.unique())
+
+    # Values of the given key index (config.key_indexes) in added or removed rows
+    def keys(self, index_name):
+        _, columns = config.key_indexes[index_name]
+        keys = [self.changed_keys[column] for column in columns if column in self.changed_keys]
+        return keys[0].append(keys[1:]).unique() if keys else pd.Index([])
+
+
+# Row hashes and key columns of the files validated by the previous run, kept in
+# directory with one pickle per file. A snapshot also records the content hash
+# of the file version it was taken from.
+class RowSnapshots():
+    def __init__(self, directory):
+        self.directory = directory
+
+    def path(self, input_dir, file):
+        name = hashlib.blake2b(os.path.abspath(os.path.join(input_dir, file)).encode(),
+                               digest_size=8).hexdigest()
+        return os.path.join(self.directory, f"{name}.pkl")
+
+    # Returns the snapshot taken of the given version of the file, None if there is none
+    def load(self, input_dir, file, content_hash):
+        path = self.path(input_dir, file)
+        if not os.path.isfile(path):
+            return None
+        snapshot = pd.read_pickle(path)
+        if snapshot.attrs.get("content_hash") != content_hash:
+            return None
+        return snapshot
+
+    def save(self, input_dir, file, df, hashes, content_hash):
+        os.makedirs(self.directory, exist_ok=True)
+        columns = [column for column in key_columns(file) if column in df.columns]
+        snapshot = df[columns].reset_index(drop=True).copy()
+        snapshot["row_hash"] = hashes
+        snapshot.attrs["content_hash"] = content_hash
+        path = self.path(input_dir, file)
+        descriptor, tmp_path = tempfile.mkstemp(prefix=os.path.basename(path) + ".",
+                                                suffix=".tmp", dir=self.directory)
+        os.close(descriptor)
+        snapshot.to_pickle(tmp_path)
+        os.replace(tmp_path, path)
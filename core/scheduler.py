@@ -0,0 +1,90 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+# Returns the files a scheme reads besides the file it validates, as declared
+# in the metadata of its Config, e.g. metadata = {"reads": [config.routes]}
+def scheme_reads(scheme):
+    metadata = getattr(scheme.Config, "metadata", None) or {}
+    return list(metadata.get("reads", []))
+
+
+# Runs the (scheme, input_file) validations registered by the checks as a
+# dependency graph on a thread pool. Every csv file is loaded once, and all loads
+# are started right away. A validation starts as soon as its own file and the
+# files its scheme reads are loaded, so loading the remaining files overlaps
+# with the validations that are already possible.
+class CheckScheduler():
+    def __init__(self, guard, workers):
+        self.guard = guard
+        self.workers = workers
+
+    # Returns the failure cases of every task, in the order of the tasks
+    def run(self, tasks):
+        if not tasks:
+            return []
+        schemes = {input_file: scheme for scheme, input_file in tasks}
+        reads = set(sum((scheme_reads(scheme) for scheme, _ in tasks), []))
+        dependencies = [[input_file] + scheme_reads(scheme) for scheme, input_file in tasks]
+        # Only csv files are loaded as frames, other files (e.g. yaml) are read by the checks
+        files = [file for file in dict.fromkeys(sum(dependencies, []))
+                 if file.endswith(".csv")]
+
+        pool = ThreadPoolExecutor(max_workers=self.workers)
+        lock = threading.Lock()
+        pending = [sum(file in files for file in set(deps)) for deps in dependencies]
+        results = [None] * len(tasks)
+        done = threading.Event()
+        remaining = [len(tasks)]
+
+        def validate(position):
+            scheme, input_file = tasks[position]
+            # Each task logs into its own collector, the failures are logged in task order at the end
+            worker = type(self.guard)(self.guard.input_dir, self.guard.loaded_files, worker=True,
+                                      log_dir=self.guard.log_dir)
+            worker.key_indexes = self.guard.key_indexes
+            worker.simulation = self.guard.simulation
+            worker.register_for_test(scheme, input_file, mode=self.guard.mode)
+            return worker.collected
+
+        def validated(position, future):
+            results[position] = future
+            with lock:
+                remaining[0] -= 1
+                if remaining[0] == 0:
+                    done.set()
+
+        def start(position):
+            future = pool.submit(validate, position)
+            future.add_done_callback(lambda f: validated(position, f))
+
+        def loaded(file, future):
+            # A file that failed to load is still released, the validation
+            # reports the error when it loads the file itself
+            ready = []
+            with lock:
+                for position, deps in enumerate(dependencies):
+                    if file in deps:
+                        pending[position] -= 1
+                        if pending[position] == 0:
+                            ready.append(position)
+            for position in ready:
+                start(position)
+
+        for position, count in enumerate(pending):
+            if count == 0:
+                start(position)
+        # A file is loaded for the scheme that validates it, unless it is
+        # validated in chunks, and as it is for the checks of the other schemes that read it
+        def load(file):
+            if file in schemes and self.guard.validated_as_frame(schemes[file]):
+                self.guard.load_file(file, schemes[file])
+            if file in reads:
+                self.guard.load_file(file)
+
+        for file in files:
+            future = pool.submit(load, file)
+            future.add_done_callback(lambda f, file=file: loaded(file, f))
+        done.wait()
+        pool.shutdown()
+        return [future.result() for future in results]
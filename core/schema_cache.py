@@ -0,0 +1,37 @@
+import threading
+from collections import OrderedDict
+
+import config
+
+_schemas = OrderedDict()
+_lock = threading.Lock()
+
+
+# Whether the columns of a scheme are built from the header of each file it
+# validates, by scheme.with_dynamic_columns_old (and with_dynamic_columns)
+def is_dynamic(scheme):
+    return hasattr(scheme, 'with_dynamic_columns') or hasattr(scheme, 'with_dynamic_columns_old')
+
+
+# Returns the compiled pandera schema that scheme.with_dynamic_columns_old
+# builds for the columns of df. Building the class and letting pandera compile
+# it costs about as much as validating a wide file, so the compiled schema is
+# memoized by the base scheme and the column names of df, and reused by every
+# file with the same header.
+def dynamic_schema(scheme, df):
+    key = (scheme, tuple(df.columns))
+    with _lock:
+        if key in _schemas:
+            _schemas.move_to_end(key)
+            return _schemas[key]
+    schema = scheme.with_dynamic_columns_old(df).to_schema()
+    with _lock:
+        _schemas[key] = schema
+        while len(_schemas) > config.max_cached_schemas:
+            _schemas.popitem(last=False)
+    return schema
+
+
+def clear():
+    with _lock:
+        _schemas.clear()
@@ -0,0 +1,38 @@
+import importlib.util
+
+import schema_cache
+
+# The pyarrow csv engine is used when pyarrow is installed
+pyarrow_available = importlib.util.find_spec("pyarrow") is not None
+
+
+# Removes the leading '#' and any quotes from a header such as '#"name"'
+def clean_column_name(column):
+    if column.startswith('#'):
+        return column.lstrip("#").lstrip('\"').rstrip('\"')
+    return column
+
+
+# Derives pd.read_csv arguments from a pandera DataFrameModel, so that a file is
+# parsed straight into the types the schema expects and only the columns the
+# schema declares are built. header holds the column names as they are in the file.
+#
+# Only columns declared with coerce=True get a dtype: pandera converts them to
+# that type anyway, while the dtype of all other columns is still inferred so
+# that the schema keeps reporting wrongly typed columns as before.
+def read_args(scheme, header):
+    schema = scheme.to_schema()
+    raw_names = {clean_column_name(column): column for column in header}
+    dtype = {}
+    for name, column in schema.columns.items():
+        if column.coerce and name in raw_names:
+            dtype[raw_names[name]] = column.dtype.type
+    args = {"dtype": dtype}
+    # Schemas with dynamic columns validate every column of the file, and so
+    # do schemas that declare no columns at all
+    if schema.columns and not schema_cache.is_dynamic(scheme):
+        args["usecols"] = [column for column in header
+                           if clean_column_name(column) in schema.columns]
+    if pyarrow_available:
+        args["engine"] = "pyarrow"
+    return args
@@ -0,0 +1,99 @@
+import json
+import os
+import socket
+import socketserver
+import sys
+import time
+
+import config
+# The schemas look up the running FabGuard through the plugin module, the
+# server has to run its FabGuard from the same module for them to find it
+import plugins.FabFlee.fab_guard.fab_guard as fab_guard
+from frame_cache import FrameCache
+# Importing the registry registers the fgcheck tests
+import plugins.FabFlee.fab_guard.registry
+
+
+# A resident FabGuard process. It keeps pandas, pandera, the compiled schemas and
+# the loaded frames warm and validates input directories on request, so a
+# validation does not pay for starting a new interpreter.
+#
+# The protocol is one JSON object per line over a Unix socket. A request
+# {"input_dir": "<path>"}, optionally with "log_dir", is answered with
+# {"status": "ok", "input_dir": ..., "log_file": ..., "failure_log": ..., "errors": <n>,
+#  "frame_cache": <hits, misses, entries and bytes of the shared frame cache>, "elapsed": <seconds>}
+# or {"status": "error", "message": ...} if the directory could not be validated.
+class ValidationHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+                response = self.server.validate(request["input_dir"], request.get("log_dir"))
+            except (ValueError, KeyError, TypeError) as err:
+                response = {"status": "error", "message": f"Invalid request: {err}"}
+            self.wfile.write((json.dumps(response) + "\n").encode())
+
+
+class ValidationServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path=None):
+        self.socket_path = socket_path or config.server_socket
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+        super().__init__(self.socket_path, ValidationHandler)
+        # Frames stay loaded between requests, changed files are reloaded
+        # because the cache is keyed by path and mtime
+        self.loaded_files = FrameCache(config.max_cache_bytes)
+
+    # Requests can arrive at the same time for directories with the same parent,
+    # so unless the request names a log_dir each directory logs to its own
+    # directory under the parent, as in verify_dirs
+    def validate(self, input_dir, log_dir=None):
+        start = time.perf_counter()
+        if log_dir is None:
+            log_dir = fab_guard.sibling_log_dir(input_dir)
+        try:
+            guard = fab_guard.FabGuard(input_dir, self.loaded_files, log_dir=log_dir)
+            guard.verify()
+        except Exception as err:
+            return {"status": "error", "input_dir": input_dir, "message": str(err)}
+        return {"status": "ok",
+                "input_dir": input_dir,
+                "log_file": os.path.abspath(guard.log_file_name),
+                "failure_log": os.path.abspath(guard.failure_sink.path) if guard.failure_sink else None,
+                "errors": guard.error_count,
+                "frame_cache": self.loaded_files.stats(),
+                "elapsed": time.perf_counter() - start}
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+
+
+def serve(socket_path=None):
+    with ValidationServer(socket_path) as server:
+        print(f"FabGuard is listening on {server.socket_path}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+# Asks a running server to validate input_dir and returns its response
+def request_validation(input_dir, socket_path=None, log_dir=None):
+    request = {"input_dir": os.path.abspath(input_dir)}
+    if log_dir is not None:
+        request["log_dir"] = os.path.abspath(log_dir)
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(socket_path or config.server_socket)
+        client.sendall((json.dumps(request) + "\n").encode())
+        with client.makefile("rb") as response:
+            return json.loads(response.readline())
+
+
+if __name__ == "__main__":
+    serve(sys.argv[1] if len(sys.argv) > 1 else None)
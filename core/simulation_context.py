@@ -0,0 +1,67 @@
+import os
+import threading
+
+import config
+
+
+# Scalar parameters of the simulation an input directory describes, parsed
+# once per run and shared by all schemas (see FabGuard.simulation). Every
+# value is memoized together with the size and mtime of the files it is
+# derived from, and parsed again only when one of these files changed.
+class SimulationContext():
+    def __init__(self, guard):
+        self.guard = guard
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def _stamp(self, files):
+        stamp = []
+        for file in files:
+            try:
+                stat = os.stat(os.path.join(self.guard.input_dir, file))
+                stamp.append((stat.st_size, stat.st_mtime_ns))
+            except FileNotFoundError:
+                stamp.append(None)
+        return tuple(stamp)
+
+    def _memo(self, name, files, compute):
+        stamp = self._stamp(files)
+        with self.lock:
+            cached = self.values.get(name)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        value = compute()
+        with self.lock:
+            self.values[name] = (stamp, value)
+        return value
+
+    # sim_period.csv transposed into one row with a Length column
+    @property
+    def sim_period(self):
+        def compute():
+            return self.guard.transpose(self.guard.load_file(config.sim_period))
+        return self._memo("sim_period", [config.sim_period], compute)
+
+    # The last day of the simulation, days count from 0
+    @property
+    def sim_period_len(self) -> int:
+        return self._memo("sim_period_len", [config.sim_period],
+                          lambda: int(self.sim_period["Length"][0]) - 1)
+
+    # simsettings.yml as a dict. yaml is only imported by runs that read it.
+    @property
+    def settings(self) -> dict:
+        import yaml
+
+        def compute():
+            with open(os.path.join(self.guard.input_dir, config.simsettings), 'r') as settings_file:
+                return yaml.load(settings_file, Loader=yaml.SafeLoader) or {}
+        return self._memo("settings", [config.simsettings], compute)
+
+    @property
+    def move_rules(self) -> dict:
+        return self.settings.get("move_rules", {})
+
+    @property
+    def max_flood_level(self) -> int:
+        return int(self.move_rules["max_flood_level"])
@@ -0,0 +1,99 @@
+import pandas as pd
+
+
+# State of a file that is validated chunk by chunk (see FabGuard.stream_for_test).
+# Checks that need the whole dataset read it through FabGuard.stream: the first
+# row of the file is kept here, and aggregates are collected by accumulators
+# that are fed every chunk and report their failures once the file is read.
+# When only some rows of a loaded file are validated (row delta), frame holds
+# the whole file instead.
+class StreamState():
+    def __init__(self, frame=None):
+        self.first_row = None
+        self.frame = frame
+        self.accumulators = {}
+
+    # Returns the accumulator registered under name, creating it on first use
+    def accumulator(self, name, factory):
+        if name not in self.accumulators:
+            self.accumulators[name] = factory()
+        return self.accumulators[name]
+
+    # The whole file for checks that compare rows across it. When the file is
+    # read in chunks, the given columns of every chunk are kept instead and
+    # None is returned; check is called with the kept columns of all chunks
+    # once the file is read, and reports failures by raising ValueError.
+    # Checks that need the same columns share what is kept.
+    def whole_file(self, name, df, columns, check):
+        if self.frame is not None:
+            return self.frame
+        kept = self.accumulator(tuple(columns), lambda: KeptColumns(columns))
+        kept.checks[name] = check
+        kept.update(df)
+        return None
+
+    # Failure cases of all accumulators, in the format of pandera's SchemaErrors.failure_cases
+    def failure_cases(self):
+        cases = [accumulator.failure_cases(name)
+                 for name, accumulator in self.accumulators.items()]
+        cases = [case for case in cases if case is not None]
+        return pd.concat(cases, ignore_index=True) if cases else None
+
+
+# Builds a pandera style failure cases frame for a dataframe level check
+def dataframe_failure_cases(check, failures):
+    return pd.DataFrame({"schema_context": "DataFrameSchema",
+                         "column": None,
+                         "check": check,
+                         "check_number": None,
+                         "failure_case": failures,
+                         "index": None})
+
+
+# Sums all columns but the first one over all chunks and reports the columns
+# whose total differs from expected by more than tolerance
+class ColumnSums():
+    def __init__(self, expected, error, tolerance=0):
+        self.expected = expected
+        self.error = error
+        self.tolerance = tolerance
+        self.sums = None
+
+    def update(self, df):
+        sums = df[df.columns[1:]].sum()
+        self.sums = sums if self.sums is None else self.sums.add(sums, fill_value=0)
+
+    def failure_cases(self, check):
+        if self.sums is None:
+            return None
+        invalid = self.sums[(self.sums - self.expected).abs() > self.tolerance]
+        if invalid.empty:
+            return None
+        errors = [f"{column},{column_sum}" for column, column_sum in invalid.items()]
+        return dataframe_failure_cases(check, [self.error(errors)])
+
+
+# Keeps some columns of every chunk, for checks that compare rows across the
+# whole file (duplicates, overlaps, the route network) without keeping the
+# whole file in memory. Every check of the chunk feeds it, a chunk is kept once.
+class KeptColumns():
+    def __init__(self, columns):
+        self.columns = columns
+        self.checks = {}
+        self.chunks = {}
+
+    def update(self, df):
+        if len(df) > 0:
+            self.chunks[df.index[0]] = df[self.columns].copy()
+
+    def failure_cases(self, name):
+        if not self.chunks:
+            return None
+        df = pd.concat(self.chunks.values())
+        cases = []
+        for check, run in self.checks.items():
+            try:
+                run(df)
+            except ValueError as err:
+                cases.append(dataframe_failure_cases(check, [str(err)]))
+        return pd.concat(cases, ignore_index=True) if cases else None
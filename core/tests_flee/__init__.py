@@ -1,5 +1,8 @@
 __all__ = ['closures_scheme', 'location_scheme','locations_test_schema',
            'routes_scheme',
+           'route_network_scheme',
            'flood_level_scheme',
+           'conflicts_scheme',
            'demographic_scheme',
+           'distr_age_schema',
            'location_flood_scheme']
\ No newline at end of file
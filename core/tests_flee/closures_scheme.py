@@ -8,12 +8,20 @@ from pandera.typing import Series, String
 import plugins.FabFlee.fab_guard.fab_guard as fg
 from plugins.FabFlee.fab_guard.error_messages import Errors
 import plugins.FabFlee.fab_guard.config as config
+from plugins.FabFlee.fab_guard.duplicates import unordered_pair_codes
+from plugins.FabFlee.fab_guard.intervals import interval_sweep
 
 # Define a validation class for the closures.csv file
 class ClosuresScheme(pa.DataFrameModel):
+    class Config:
+        # Files the checks of this scheme read, besides the validated file, and
+        # the columns whose values are looked up in key indexes of those files
+        metadata = {"reads": [config.locations, config.sim_period],
+                    "references": {"name1": "locations.country", "name2": "locations.country"}}
+
     # Define simple constraints for all the columns
-    closure_type: Series[pa.String] = pa.Field(
-        isin=["location", "country", "links", "camp", "idcamp"])
+    closure_type: Series[pa.Category] = pa.Field(
+        isin=["location", "country", "links", "camp", "idcamp"], coerce=True)
     name1: Series[pa.String] = pa.Field()
     name2: Series[pa.String] = pa.Field(nullable=True)
     closure_start: Series[pa.Int64] = pa.Field(nullable=True,coerce=True)
@@ -21,11 +29,8 @@ class ClosuresScheme(pa.DataFrameModel):
 
     @pa.dataframe_check()
     def closure_type_country(cls, df: pd.DataFrame) -> Series[bool]:
-        # Load the content of the "locations" file
-        dfl = fg.FabGuard.get_instance().load_file(config.locations)
-
-        # Get a list of countries from the "locations" file
-        loc_countries = dfl["country"].tolist()
+        # Hash index of the countries in the "locations" file
+        loc_countries = fg.FabGuard.current().index("locations.country")
 
         # Define a mask to check if the conditions are met
         mask = ((df["closure_type"] == "country")
@@ -36,4 +41,45 @@ class ClosuresScheme(pa.DataFrameModel):
         if mask.any():  # Check if any rows meet the condition
             raise ValueError(Errors.closures_type_country_err(
                 df.index[mask], config.locations))
-        return ~mask
\ No newline at end of file
+        return ~mask
+
+    @pa.dataframe_check()
+    def closure_start_before_end(cls, df: pd.DataFrame) -> Series[bool]:
+        mask = (df["closure_start"] > df["closure_end"]).fillna(False)
+        if mask.any():
+            raise ValueError(Errors.closures_start_end_err(df.index[mask], config.closures))
+        return ~mask
+
+    # Closures of the same type between the same two names (in either order)
+    # may not overlap, found in one sweep over the closures sorted by start
+    @pa.dataframe_check()
+    def closures_do_not_overlap(cls, df: pd.DataFrame) -> Series[bool]:
+        return fg.FabGuard.current().check_whole_file(
+            "closures_do_not_overlap", df,
+            ["closure_type", "name1", "name2", "closure_start", "closure_end"],
+            cls.overlapping_closures)
+
+    # Raises for the given rows that overlap another closure, returns which of them do not
+    @classmethod
+    def overlapping_closures(cls, closures, rows):
+        types = pd.factorize(closures["closure_type"])[0]
+        pairs = unordered_pair_codes(closures["name1"], closures["name2"])
+        keys = pairs * (types.max(initial=0) + 1) + types
+        overlapping = interval_sweep(keys, closures["closure_start"].astype("Float64"),
+                                     closures["closure_end"].astype("Float64"))
+        mask = pd.Series(rows.isin(closures.index[overlapping]), index=rows)
+        if mask.any():
+            raise ValueError(Errors.closures_overlap_err(
+                closures.index[overlapping].intersection(rows), config.closures))
+        return ~mask
+
+    @pa.dataframe_check()
+    def closures_within_sim_period(cls, df: pd.DataFrame) -> Series[bool]:
+        guard = fg.FabGuard.current()
+        if not os.path.isfile(os.path.join(guard.input_dir, config.sim_period)):
+            return pd.Series(True, index=df.index)
+        last_day = guard.simulation.sim_period_len
+        mask = ((df["closure_start"] < 0) | (df["closure_end"] > last_day)).fillna(False)
+        if mask.any():
+            raise ValueError(Errors.closures_period_err(df.index[mask], config.closures))
+        return ~mask
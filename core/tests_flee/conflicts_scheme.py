@@ -0,0 +1,26 @@
+import os
+import pandas as pd
+import pandera as pa
+from pandera.typing import Series, String, DataFrame
+
+import plugins.FabFlee.fab_guard.fab_guard as fg
+import plugins.FabFlee.fab_guard.config as config
+from plugins.FabFlee.fab_guard.matrix_file import MatrixRules
+
+
+# conflicts.csv, a day x location matrix. The scheme declares no columns, as
+# the locations differ per input directory.
+class ConflictsScheme(pa.DataFrameModel):
+    class Config:
+        # Files the checks of this scheme read, besides the validated file
+        metadata = {"reads": [config.sim_period]}
+
+    # FabGuard validates conflicts.csv as one day x location array with these
+    # rules (see FabGuard.validate_matrix): the conflict intensity of every
+    # location lies between 0 and 1
+    @classmethod
+    def matrix_rules(cls):
+        guard = fg.FabGuard.current()
+        last_day = guard.simulation.sim_period_len \
+            if os.path.isfile(os.path.join(guard.input_dir, config.sim_period)) else None
+        return MatrixRules(min_value=0, max_value=1, last_day=last_day)
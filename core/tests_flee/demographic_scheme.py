@@ -7,6 +7,12 @@ from pandera.typing import Series, String, DataFrame
 import plugins.FabFlee.fab_guard.fab_guard as fg
 from plugins.FabFlee.fab_guard.error_messages import Errors
 import plugins.FabFlee.fab_guard.config as config
+from plugins.FabFlee.fab_guard.streaming import ColumnSums
+from plugins.FabFlee.fab_guard.column_groups import ColumnGroup
+
+# All columns but the first one hold fractions that add up to 1, up to the
+# rounding of the fractions written to the files
+fraction_columns = ColumnGroup(start=1, min_value=0, max_value=1, total=1, tolerance=1e-6)
 
 
 class DemographicScheme(pa.DataFrameModel):
@@ -14,28 +20,31 @@ class DemographicScheme(pa.DataFrameModel):
 
     @pa.dataframe_check
     def all_but_first_column_sum_is_1(cls, df: DataFrame) -> bool:
-        # Iterate over the names of all columns except the first one
-        errors = []
-        for column_name in df.columns[1:]:
-            column_sum = df[column_name].sum()
-            if column_sum != 1:
-                errors.append(f"{column_name},{column_sum}")
+        stream = fg.FabGuard.current().stream
+        if stream is not None:
+            # df is one chunk of the file, the sums are checked once all chunks are read
+            stream.accumulator("all_but_first_column_sum_is_1", lambda: ColumnSums(
+                1, lambda errors: Errors.sum_of_columns_is_1(errors, config.demograohic_files_pattern),
+                tolerance=fraction_columns.tolerance)).update(df)
+            return True
+        errors = [f"{column_name},{column_sum}"
+                  for column_name, column_sum in fraction_columns.sum_violations(df).items()]
         if len(errors) > 0:
             raise ValueError(Errors.sum_of_columns_is_1(errors, config.demograohic_files_pattern))
         return True
 
+    # Range and type of all columns but the first one, checked as one block
+    @pa.dataframe_check
+    def fraction_columns_in_range(cls, df: DataFrame) -> DataFrame:
+        return fraction_columns.valid(df)
 
     @classmethod
     def with_dynamic_columns_old(cls, df: pd.DataFrame):
-        all_other_fields = pa.Field(coerce=True, in_range={"min_value": 0, "max_value": 100})
         # Create a new class dynamically
         dynamic_attrs = {'__annotations__': {}}
 
-        # Iterate over the column names, skipping the first one
-        for column in df.columns[1:]:
-            dynamic_attrs['__annotations__'][column] = Series[pa.Float]
-            all_other_fields = pa.Field(coerce=True, in_range={"min_value": 0, "max_value": 1})
-            dynamic_attrs[column] = all_other_fields
+        # The columns are not declared one by one, fraction_columns_in_range
+        # checks them all in one pass
 
         # Create a new class with the dynamic columns
         # return type('ExtendedDistrAgeScheme', (DistrAgeScheme,), dynamic_attrs)
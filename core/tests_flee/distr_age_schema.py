@@ -7,6 +7,11 @@ from pandera.typing import Series, String, DataFrame
 import plugins.FabFlee.fab_guard.fab_guard as fg
 from plugins.FabFlee.fab_guard.error_messages import Errors
 import plugins.FabFlee.fab_guard.config as config
+from plugins.FabFlee.fab_guard.streaming import ColumnSums
+from plugins.FabFlee.fab_guard.column_groups import ColumnGroup
+
+# All columns but Age hold percentages of the population of one location
+age_columns = ColumnGroup(start=1, min_value=0, max_value=100, total=100)
 
 
 class DistrAgeScheme(pa.DataFrameModel):
@@ -16,16 +21,23 @@ class DistrAgeScheme(pa.DataFrameModel):
 
     @pa.dataframe_check
     def all_but_first_column_sum_is_100(cls, df: DataFrame) -> bool:
-        # Iterate over the names of all columns except the first one
-        errors = []
-        for column_name in df.columns[1:]:
-            column_sum = df[column_name].sum()
-            if column_sum != 100:
-                errors.append(f"{column_name},{column_sum}")
+        stream = fg.FabGuard.current().stream
+        if stream is not None:
+            # df is one chunk of the file, the sums are checked once all chunks are read
+            stream.accumulator("all_but_first_column_sum_is_100", lambda: ColumnSums(
+                100, lambda errors: Errors.sum_of_columns_is_100(errors, config.distr_age))).update(df)
+            return True
+        errors = [f"{column_name},{column_sum}"
+                  for column_name, column_sum in age_columns.sum_violations(df).items()]
         if len(errors) > 0:
             raise ValueError(Errors.sum_of_columns_is_100(errors, config.distr_age))
         return True
 
+    # Range and type of all columns but Age, checked as one block
+    @pa.dataframe_check
+    def age_columns_in_range(cls, df: DataFrame) -> DataFrame:
+        return age_columns.valid(df)
+
     def __new__(cls, *args, **kwargs):
         # Dynamically add fields based on a provided DataFrame
         print("Inside")
@@ -57,18 +69,12 @@ class DistrAgeScheme(pa.DataFrameModel):
         age_fieled = pa.Field(coerce=True, nullable=True,
                              in_range={"min_value": 0, "max_value": 120})
 
-        all_other_fields = pa.Field(coerce=True, in_range={"min_value": 0, "max_value": 100})
         # Create a new class dynamically
         dynamic_attrs = {'__annotations__': {'Age': Series[pa.Float]}}
         dynamic_attrs['Age'] = age_fieled
 
-        # Retrieve existing annotations and fields from DistrAgeScheme
-
-        # Iterate over the column names, skipping the first one
-        for column in df.columns[1:]:
-            dynamic_attrs['__annotations__'][column] = Series[pa.Float]
-            all_other_fields = pa.Field(coerce=True, in_range={"min_value": 0, "max_value": 100})
-            dynamic_attrs[column] = all_other_fields
+        # The other columns are not declared one by one, age_columns_in_range
+        # checks them all in one pass
 
         # Create a new class with the dynamic columns
         # return type('ExtendedDistrAgeScheme', (DistrAgeScheme,), dynamic_attrs)
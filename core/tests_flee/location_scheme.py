@@ -6,37 +6,44 @@ from pandera.typing import Series, String
 import plugins.FabFlee.fab_guard.fab_guard as fg
 from plugins.FabFlee.fab_guard.error_messages import Errors
 import plugins.FabFlee.fab_guard.config as config
+from plugins.FabFlee.fab_guard.check_fusion import predicates
+from plugins.FabFlee.fab_guard import geo
 
+# The dataframe checks share their predicate masks through check_fusion.predicates,
+# so e.g. location_type == "conflict_zone" is computed once per validation
 class LocationsScheme(pa.DataFrameModel):
+    class Config:
+        # Files the checks of this scheme read, besides the validated file, and
+        # the columns whose values are looked up in key indexes of those files
+        metadata = {"reads": [config.routes],
+                    "references": {"name": "routes.names"}}
+
     # name: Series[pa.String] = pa.Field(nullable=False, alias='#"name"')
     name: Series[pa.String] = pa.Field(nullable=False)
     region: Series[pa.String] = pa.Field()
-    country: Series[pa.String] = pa.Field()
+    country: Series[pa.Category] = pa.Field(coerce=True)
     lat: Series[pa.Float] = pa.Field(coerce=True,ge=180,le=180)
     lon: Series[pa.Float] = pa.Field(coerce=True, ge=180,le=180)
-    location_type: Series[pa.String] = pa.Field(
-        isin = ["conflict_zone", "town","camp", "forwarding_hub", "marker", "idpcamp"])
+    location_type: Series[pa.Category] = pa.Field(
+        isin = ["conflict_zone", "town","camp", "forwarding_hub", "marker", "idpcamp"], coerce=True)
     conflict_date: Series[float] = pa.Field(nullable=True, coerce=True)
     population: Series[float] = pa.Field(ge=0,nullable=True,coerce=True)
 
     # Define column-level validation check, constraint applies to all values in a column
-    @pa.check(name,element_wise=True)
-    def names_in_routes(cls, name):
-        # Load the content of the routes file in a dataframe
-        dfr = fg.FabGuard.get_instance().load_file(config.routes)
-        # Convert the content of the '#"name1"' column to a list
-        rnames = dfr["name1"].tolist()
-        # Convert the content of the "name2"' column to a list
-        rnames.extend(dfr["name2"].tolist())
+    @pa.check("name")
+    def names_in_routes(cls, name: Series[str]) -> Series[bool]:
+        # Hash index of the names in the name1 and name2 columns of the routes file
+        route_names = fg.FabGuard.current().index("routes.names")
         # Check if the name column is in the either name1 or name2 columns
-        return name in rnames
+        return name.isin(route_names)
 
 
     # Coordinate validation check
     @pa.dataframe_check()
     def coords_are_real(cls,df: pd.DataFrame) -> Series[bool]:
-        mask = (((df["lat"] > 180.0) & (df["lat"] < -180.0))
-                | ((df["lon"] > 180.0) & (df["lon"] < -180.0)))
+        p = predicates(df)
+        mask = ((p.compare("lat", ">", 180.0) & p.compare("lat", "<", -180.0))
+                | (p.compare("lon", ">", 180.0) & p.compare("lon", "<", -180.0)))
 
         # Filter the DataFrame to keep only valid rows
         if mask.any():  # Check if any rows meet the condition
@@ -44,6 +51,27 @@ class LocationsScheme(pa.DataFrameModel):
         return ~mask
         
 
+    # Locations with the same or almost the same coordinates
+    @pa.dataframe_check()
+    def coords_not_duplicated(cls, df: pd.DataFrame) -> Series[bool]:
+        return fg.FabGuard.current().check_whole_file(
+            "coords_not_duplicated", df, ["lat", "lon"], cls.duplicate_coords)
+
+    # Raises for the pairs of locations in the given rows with (almost) the
+    # same coordinates, returns which of the rows are in no such pair
+    @classmethod
+    def duplicate_coords(cls, locations, rows):
+        first, second, distances = geo.near_duplicate_pairs(
+            locations["lat"], locations["lon"], config.duplicate_coordinates_km)
+        duplicated = locations.index[first].union(locations.index[second])
+        mask = pd.Series(rows.isin(duplicated), index=rows)
+        if mask.any():
+            invalid = [(row1, row2, round(float(km), 3)) for row1, row2, km
+                       in zip(locations.index[first], locations.index[second], distances)
+                       if row1 in rows or row2 in rows]
+            raise ValueError(Errors.location_duplicate_coords_err(invalid, config.locations))
+        return ~mask
+
     # Coordinate validation check
     """
     @pa.dataframe_check()
@@ -60,11 +88,10 @@ class LocationsScheme(pa.DataFrameModel):
     @pa.dataframe_check()
     def population_gt_0(cls,df: pd.DataFrame)->Series[bool]:
         # Define conditions based on 'location_type' and 'population' columns
-        mask = ((df["location_type"] == "camp") & (df["population"] <= 0)
-                 | ((df["location_type"] == "town") & (df["population"] <= 0))
-                 | ((df["location_type"] == "conflict_zone") & (df["population"] <= 0))
-                 | ((df["location_type"] == "marker") & (df["population"] != 0))
-                 | ((df["location_type"] == "forwarding_hub") & (df["population"] < 0)))
+        p = predicates(df)
+        mask = (p.isin("location_type", ["camp", "town", "conflict_zone"]) & p.compare("population", "<=", 0)
+                 | (p.eq("location_type", "marker") & p.compare("population", "!=", 0))
+                 | (p.eq("location_type", "forwarding_hub") & p.compare("population", "<", 0)))
 
         # Filter the DataFrame to keep only valid rows
         if mask.any():  # Check if any rows meet the condition
@@ -74,7 +101,8 @@ class LocationsScheme(pa.DataFrameModel):
     @pa.dataframe_check()
     def population_gt_0(cls, df: pd.DataFrame) -> Series[bool]:
         # Define conditions based on 'location_type' and 'population' columns
-        mask = ((df["location_type"] == "conflict_zone") & (df["population"] <= 0))
+        p = predicates(df)
+        mask = (p.eq("location_type", "conflict_zone") & p.compare("population", "<=", 0))
 
         # Filter the DataFrame to keep only valid rows
         if mask.any():  # Check if any rows meet the condition
@@ -85,7 +113,8 @@ class LocationsScheme(pa.DataFrameModel):
     @pa.dataframe_check(ignore_na=False)
     def conflict_zone_has_conflict_date(cls,df: pd.DataFrame)->Series[bool]:
         # Check if there are missing values in 'conflict_date' when 'location_type' is 'conflict_zone'
-        mask = ((df["location_type"] == "conflict_zone") & (pd.isnull(df["conflict_date"])))
+        p = predicates(df)
+        mask = (p.eq("location_type", "conflict_zone") & p.isnull("conflict_date"))
 
         if mask.any():  # Check if any rows meet the condition
             raise ValueError(Errors.location_conflict_zone_err(df.index[mask], config.locations))
@@ -93,10 +122,14 @@ class LocationsScheme(pa.DataFrameModel):
 
     @pa.dataframe_check()
     def conflict_zone_country_should_be_0(cls, df: pd.DataFrame) -> Series[bool]:
-        # Determine the country value in the first row
-        country = df["country"][0]
+        # Determine the country value in the first row of the file, which
+        # is not part of df when the file is validated in chunks
+        stream = fg.FabGuard.current().stream
+        first_row = df.iloc[0] if stream is None else stream.first_row
+        country = first_row["country"]
         # Check if 'country' is not equal to the determined value when 'location_type' is 'conflict_zone'
-        mask = ((df["location_type"] == "conflict_zone") & (df["country"]!=country))
+        p = predicates(df)
+        mask = (p.eq("location_type", "conflict_zone") & ~p.eq("country", country))
 
         if mask.any():  # Check if any rows meet the condition
             raise ValueError(Errors.location_country_err(df.index[mask], config.locations))
@@ -0,0 +1,69 @@
+import os
+import pandas as pd
+import pandera as pa
+from pandera.typing import Series, String
+
+import plugins.FabFlee.fab_guard.fab_guard as fg
+from plugins.FabFlee.fab_guard.error_messages import Errors
+import plugins.FabFlee.fab_guard.config as config
+from plugins.FabFlee.fab_guard.network import route_network
+
+
+# Checks on the graph the routes make between the locations. The scheme
+# declares no columns, the columns of routes.csv are checked by RoutesScheme.
+class RouteNetworkScheme(pa.DataFrameModel):
+    class Config:
+        # Files the checks of this scheme read, besides the validated file.
+        # The checks judge the network as a whole, a removed route can break
+        # it without any row changing, so the whole file is always validated.
+        metadata = {"reads": [config.locations], "row_delta": False}
+
+    # The checks run on the whole routes file
+    @classmethod
+    def check_network(cls, name, df, check):
+        return fg.FabGuard.current().check_whole_file(name, df, ["name1", "name2"],
+                                                      lambda routes, rows: check(routes))
+
+    @classmethod
+    def network(cls, routes):
+        return route_network(fg.FabGuard.current().load_file(config.locations), routes)
+
+    @pa.dataframe_check
+    def camps_reachable_from_conflict_zone(cls, df: pd.DataFrame) -> bool:
+        return cls.check_network("camps_reachable_from_conflict_zone", df, cls.camps_reachable)
+
+    @pa.dataframe_check
+    def locations_not_isolated(cls, df: pd.DataFrame) -> bool:
+        return cls.check_network("locations_not_isolated", df, cls.no_isolated_locations)
+
+    @pa.dataframe_check
+    def network_is_connected(cls, df: pd.DataFrame) -> bool:
+        return cls.check_network("network_is_connected", df, cls.connected)
+
+    @classmethod
+    def camps_reachable(cls, routes):
+        network = cls.network(routes)
+        unreachable = network.unreachable(["camp", "idpcamp"], ["conflict_zone"])
+        if len(unreachable) > 0:
+            names = list(network.locations["name"].iloc[unreachable])
+            raise ValueError(Errors.network_unreachable_camps_err(names, config.routes))
+        return True
+
+    @classmethod
+    def no_isolated_locations(cls, routes):
+        network = cls.network(routes)
+        isolated = network.isolated()
+        if len(isolated) > 0:
+            names = list(network.locations["name"].iloc[isolated])
+            raise ValueError(Errors.network_isolated_locations_err(names, config.routes))
+        return True
+
+    @classmethod
+    def connected(cls, routes):
+        network = cls.network(routes)
+        components = network.components()
+        if len(components) > 1:
+            # Every component but the largest one, by the names of its locations
+            names = [list(network.locations["name"].iloc[component]) for component in components[1:]]
+            raise ValueError(Errors.network_disconnected_err(names, config.routes))
+        return True
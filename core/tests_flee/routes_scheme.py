@@ -1,12 +1,64 @@
 import os
+import numpy as np
 import pandas as pd
 import pandera as pa
 from pandera import Column, Check, Index
 from pandera.typing import Series, String
 
+import plugins.FabFlee.fab_guard.fab_guard as fg
+from plugins.FabFlee.fab_guard.error_messages import Errors
+import plugins.FabFlee.fab_guard.config as config
+from plugins.FabFlee.fab_guard import geo
+from plugins.FabFlee.fab_guard.duplicates import unordered_pair_codes, duplicate_groups
+
 class RoutesScheme(pa.DataFrameModel):
+    class Config:
+        # Files the checks of this scheme read, besides the validated file
+        metadata = {"reads": [config.locations]}
+
     name1: Series[pa.String] = pa.Field(nullable=False)
     name2: Series[pa.String] = pa.Field(nullable=False)
     distance: Series[int] = pa.Field(ge=0)
     forced_redirection: Series[float] = pa.Field(
         isin=[0, 1, 2], nullable=True, coerce=True)
+
+    # The distance of a route against the great-circle distance between its locations
+    @pa.dataframe_check()
+    def distance_matches_coordinates(cls, df: pd.DataFrame) -> Series[bool]:
+        locations = fg.FabGuard.current().load_file(config.locations)
+        mask, great_circle = geo.route_distance_mismatches(
+            df, locations, config.route_distance_tolerance,
+            config.route_max_detour, config.route_distance_slack_km)
+        if mask.any():
+            invalid = [(row, distance, round(float(km), 1)) for row, distance, km
+                       in zip(df.index[mask], df["distance"][mask], great_circle[mask.to_numpy()])]
+            raise ValueError(Errors.route_distance_err(invalid, config.routes))
+        return ~mask
+
+    # Routes between the same two locations, in either direction
+    @pa.dataframe_check()
+    def routes_unique(cls, df: pd.DataFrame) -> Series[bool]:
+        return fg.FabGuard.current().check_whole_file(
+            "routes_unique", df, ["name1", "name2", "distance"], cls.duplicate_routes)
+
+    # Raises for the duplicates in routes of the given rows, returns which of the rows are no duplicates
+    @classmethod
+    def duplicate_routes(cls, routes, rows):
+        groups = duplicate_groups(unordered_pair_codes(routes["name1"], routes["name2"]))
+        if groups:
+            # Only the groups with one of the given rows are reported
+            positions = np.concatenate(groups)
+            touched = routes.index[positions].isin(rows)
+            group_of = np.repeat(np.arange(len(groups)), [len(group) for group in groups])
+            reported = np.bincount(group_of, weights=touched, minlength=len(groups)) > 0
+            groups = [group for group, keep in zip(groups, reported) if keep]
+        duplicated = routes.index[np.concatenate(groups)] if groups else routes.index[:0]
+        mask = pd.Series(rows.isin(duplicated), index=rows)
+        if mask.any():
+            distance = routes["distance"].to_numpy()
+            invalid = [(routes["name1"].iloc[group[0]], routes["name2"].iloc[group[0]],
+                        list(routes.index[group]),
+                        "conflicting distances" if len(set(distance[group])) > 1 else "same distance")
+                       for group in groups]
+            raise ValueError(Errors.route_duplicate_err(invalid, config.routes))
+        return ~mask
@@ -21,11 +21,8 @@ class ClosuresScheme(pa.DataFrameModel):
 
     @pa.dataframe_check()
     def closure_type_country(cls, df: pd.DataFrame) -> Series[bool]:
-        # Load the content of the "locations" file
-        dfl = fg.FabGuard.get_instance().load_file(config.locations)
-
-        # Get a list of countries from the "locations" file
-        loc_countries = dfl["country"].tolist()
+        # Hash index of the countries in the "locations" file
+        loc_countries = fg.FabGuard.current().index("locations.country")
 
         # Define a mask to check if the conditions are met
         mask = ((df["closure_type"] == "country")
@@ -21,16 +21,12 @@ class LocationsScheme(pa.DataFrameModel):
     population: Series[float] = pa.Field(ge=0,nullable=True,coerce=True)
 
     # Define column-level validation check, constraint applies to all values in a column
-    @pa.check(name,element_wise=True)
-    def names_in_routes(cls, name):
-        # Load the content of the routes file in a dataframe
-        dfr = fg.FabGuard.get_instance().load_file(config.routes)
-        # Convert the content of the '#"name1"' column to a list
-        rnames = dfr["name1"].tolist()
-        # Convert the content of the "name2"' column to a list
-        rnames.extend(dfr["name2"].tolist())
+    @pa.check("name")
+    def names_in_routes(cls, name: Series[str]) -> Series[bool]:
+        # Hash index of the names in the name1 and name2 columns of the routes file
+        route_names = fg.FabGuard.current().index("routes.names")
         # Check if the name column is in the either name1 or name2 columns
-        return name in rnames
+        return name.isin(route_names)
 
 
     # Coordinate validation check
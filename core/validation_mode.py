@@ -0,0 +1,63 @@
+import copy
+import time
+
+import config
+
+
+# How far a validation run goes once it finds failures:
+#  - lazy collection (the default) collects every failure of every check,
+#  - fail fast stops the whole run at the first failure,
+#  - an error budget keeps at most max_failures_per_check failures per check,
+#  - a time budget stops validating further files once time_budget seconds passed.
+class ValidationMode():
+    def __init__(self, lazy=True, max_failures_per_check=None, time_budget=None):
+        self.lazy = lazy
+        self.max_failures_per_check = max_failures_per_check
+        self.time_budget = time_budget
+        self.deadline = None
+
+    @classmethod
+    def from_config(cls):
+        return cls(config.lazy, config.max_failures_per_check, config.time_budget)
+
+    @classmethod
+    def fail_fast(cls):
+        return cls(lazy=False)
+
+    @classmethod
+    def error_budget(cls, max_failures_per_check):
+        return cls(max_failures_per_check=max_failures_per_check)
+
+    @classmethod
+    def timed(cls, time_budget):
+        return cls(time_budget=time_budget)
+
+    @property
+    def stops_at_first_failure(self):
+        return not self.lazy
+
+    # Whether a validation in this mode finds every failure, only such results
+    # can be stored for incremental runs
+    @property
+    def collects_all(self):
+        return self.lazy and self.max_failures_per_check is None
+
+    # Returns a copy of the mode whose time budget starts now, so that a mode
+    # can be reused for several runs. A started mode, such as the one a worker
+    # gets from the run it belongs to, keeps its deadline.
+    def start(self):
+        if self.time_budget is None or self.deadline is not None:
+            return self
+        started = copy.copy(self)
+        started.deadline = time.monotonic() + self.time_budget
+        return started
+
+    def expired(self):
+        return self.deadline is not None and time.monotonic() > self.deadline
+
+    # Keeps the first max_failures_per_check failure cases of every check
+    def limit(self, failure_cases):
+        if self.max_failures_per_check is None or failure_cases is None:
+            return failure_cases
+        return failure_cases.groupby("check", sort=False, dropna=False) \
+            .head(self.max_failures_per_check).reset_index(drop=True)
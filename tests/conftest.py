@@ -0,0 +1,29 @@
+import os
+import shutil
+import sys
+import tempfile
+
+core = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "core")
+_root = None
+
+
+# FabGuard runs as a plugin of FabSim3: its modules import each other by bare
+# name, the schemas import them as plugins.FabFlee.fab_guard.* and core/tests_flee
+# is installed as fab_guard/tests. The tests run against that layout, built
+# from links to the sources.
+def pytest_configure(config):
+    global _root
+    os.environ.setdefault("DISABLE_PANDERA_IMPORT_WARNING", "True")
+    _root = tempfile.mkdtemp(prefix="fabguard-tests-")
+    plugin = os.path.join(_root, "plugins", "FabFlee", "fab_guard")
+    os.makedirs(plugin)
+    for name in os.listdir(core):
+        if name.endswith(".py"):
+            os.symlink(os.path.join(core, name), os.path.join(plugin, name))
+    os.symlink(os.path.join(core, "tests_flee"), os.path.join(plugin, "tests"))
+    sys.path[:0] = [_root, plugin]
+
+
+def pytest_unconfigure(config):
+    if _root is not None:
+        shutil.rmtree(_root, ignore_errors=True)
@@ -0,0 +1,13 @@
+from plugins.FabFlee.fab_guard.duplicates import duplicate_groups, unordered_pair_codes
+
+
+def test_pairs_in_either_order_share_a_code():
+    codes = unordered_pair_codes(["A", "B", "A", "A"], ["B", "A", "C", "A"])
+    assert codes[0] == codes[1]
+    assert len({codes[0], codes[2], codes[3]}) == 3
+
+
+def test_duplicate_groups_in_order_of_first_row():
+    groups = duplicate_groups([7, 3, 7, 5, 3, 7])
+    assert [list(group) for group in groups] == [[0, 2, 5], [1, 4]]
+    assert duplicate_groups([1, 2, 3]) == []
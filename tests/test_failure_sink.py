@@ -0,0 +1,35 @@
+import json
+
+import pandas as pd
+import pytest
+
+import plugins.FabFlee.fab_guard.fab_guard as fg
+from plugins.FabFlee.fab_guard.tests.routes_scheme import RoutesScheme
+
+from test_row_delta import LOCATIONS, ROUTES, write
+
+
+@pytest.fixture
+def input_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(fg.config, "cache_dir", str(tmp_path / "cache"))
+    input_dir = tmp_path / "flee"
+    input_dir.mkdir()
+    write(input_dir / "locations.csv", LOCATIONS)
+    write(input_dir / "routes.csv", ROUTES + "A,B,11,\n")
+    return input_dir
+
+
+def test_test_registered_outside_verify_is_written(input_dir):
+    guard = fg.FabGuard(str(input_dir))
+    guard.register_for_test(RoutesScheme, "routes.csv")
+    with open(guard.failure_sink.path) as failure_log:
+        assert [json.loads(line)["check"] for line in failure_log] == ["routes_unique"]
+
+
+def test_parquet_log_keeps_earlier_failures(input_dir, monkeypatch):
+    pytest.importorskip("pyarrow")
+    monkeypatch.setattr(fg.config, "failure_log", "failures.parquet")
+    guard = fg.FabGuard(str(input_dir))
+    guard.register_for_test(RoutesScheme, "routes.csv")
+    guard.register_for_test(RoutesScheme, "routes.csv")
+    assert list(pd.read_parquet(guard.failure_sink.path)["check"]) == ["routes_unique"] * 2
@@ -0,0 +1,35 @@
+import pandas as pd
+
+import plugins.FabFlee.fab_guard.fab_guard as fg
+from plugins.FabFlee.fab_guard.frame_cache import FrameCache
+from plugins.FabFlee.fab_guard.tests.location_scheme import LocationsScheme
+
+from test_row_delta import LOCATIONS, ROUTES, write
+
+
+def test_plain_reads_reuse_the_typed_frame(tmp_path, monkeypatch):
+    monkeypatch.setattr(fg.config, "columnar_cache", False)
+    input_dir = tmp_path / "flee"
+    input_dir.mkdir()
+    write(input_dir / "locations.csv", LOCATIONS)
+    guard = fg.FabGuard(str(input_dir))
+    typed = guard.load_file("locations.csv", LocationsScheme)
+    # Nothing is read again
+    monkeypatch.setattr(guard, "read_file", None)
+    assert guard.load_file("locations.csv") is typed
+    assert list(guard.key_indexes.build("locations.csv", "name")) == ["A", "B", "C"]
+    assert guard.loaded_files.stats()["bytes"] == typed.memory_usage(index=True, deep=True).sum()
+
+
+def test_shared_frame_is_evicted_under_every_variant(tmp_path):
+    locations, routes = tmp_path / "locations.csv", tmp_path / "routes.csv"
+    write(locations, LOCATIONS)
+    write(routes, ROUTES)
+    df = pd.read_csv(locations)
+    cache = FrameCache(max_bytes=df.memory_usage(index=True, deep=True).sum())
+    cache.put(str(locations), df, "typed")
+    cache.put(str(locations), df, "plain")
+    assert len(cache) == 2
+    cache.put(str(routes), pd.read_csv(routes))
+    assert len(cache) == 1
+    assert cache.stats()["bytes"] == cache.frames[next(iter(cache.frames))][1]
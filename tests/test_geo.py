@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+
+from plugins.FabFlee.fab_guard.geo import haversine, near_duplicate_pairs, route_distance_mismatches
+
+
+def test_haversine():
+    # A quarter of the equator, and one degree of latitude
+    distances = haversine([0, 0], [0, 10], [0, 1], [90, 10])
+    assert np.allclose(distances, [np.pi / 2 * 6371.0088, 6371.0088 * np.pi / 180])
+
+
+def test_near_duplicate_pairs():
+    # Points 0 and 2 are about 100 m apart, 3 is 1 km from 0, 4 has no coordinates
+    lat = [0.0, 10.0, 0.0009, 0.009, np.nan]
+    lon = [0.0, 10.0, 0.0, 0.0, 0.0]
+    first, second, distances = near_duplicate_pairs(lat, lon, 0.5)
+    assert list(zip(first, second)) == [(0, 2)]
+    assert np.allclose(distances, haversine([0.0], [0.0], [0.0009], [0.0]))
+
+
+def test_near_duplicate_pairs_across_the_antimeridian():
+    first, second, _ = near_duplicate_pairs([0.0, 0.0], [179.9999, -179.9999], 0.1)
+    assert list(zip(first, second)) == [(0, 1)]
+
+
+def test_route_distance_mismatches():
+    locations = pd.DataFrame({"name": ["A", "B"], "lat": [0.0, 0.0], "lon": [0.0, 0.1]})
+    # The great circle from A to B is about 11.1 km, C is unknown
+    routes = pd.DataFrame({"name1": ["A", "A", "A", "A"], "name2": ["B", "B", "B", "C"],
+                           "distance": [11, 5, 50, 1]})
+    mismatches, great_circle = route_distance_mismatches(routes, locations, tolerance=0.1,
+                                                         max_detour=3, slack_km=0.5)
+    assert list(mismatches) == [False, True, True, False]
+    assert np.isnan(great_circle[3])
@@ -0,0 +1,17 @@
+import numpy as np
+
+from plugins.FabFlee.fab_guard.intervals import interval_sweep
+
+
+def test_overlaps_within_each_key():
+    keys = ["a", "b", "a", "a", "b", "a"]
+    starts = [0, 0, 5, 11, 10, 8]
+    ends = [10, 5, 7, 12, 12, np.nan]
+    # [5, 7] lies in [0, 10]; [11, 12] starts after it; b's intervals are apart;
+    # the interval without an end is left out
+    assert list(interval_sweep(keys, starts, ends)) == [2]
+
+
+def test_touching_intervals_overlap():
+    # Both ends are inclusive, the first day of the second is the last of the first
+    assert list(interval_sweep(["a", "a"], [5, 0], [9, 5])) == [0]
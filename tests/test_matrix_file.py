@@ -0,0 +1,95 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+import plugins.FabFlee.fab_guard.fab_guard as fg
+from plugins.FabFlee.fab_guard.matrix_file import Matrix, MatrixRules
+from plugins.FabFlee.fab_guard.tests.flood_level_scheme import FloodLevelScheme
+
+
+MATRIX = """Day,F1,F2
+0,0,1
+1,2.5,1
+3,1,-1
+"""
+
+
+# The failure cases as (check, column, row, value)
+def cases(failure_cases):
+    columns = ["check", "column", "index", "failure_case"]
+    return [tuple(case) for case in failure_cases[columns].itertuples(index=False)]
+
+
+def test_failure_cases(tmp_path):
+    path = tmp_path / "flood_level.csv"
+    path.write_text(MATRIX)
+    matrix = Matrix.load(str(path))
+    assert matrix.zones == ["F1", "F2"]
+    rules = MatrixRules(min_value=0, max_value=2, integer=True, last_day=2)
+    assert sorted(cases(matrix.failure_cases(rules))) == [
+        ("day_less_than_or_equal_to(2)", "Day", 2, 3.0),
+        ("day_sequence", "Day", 2, 3.0),
+        ("greater_than_or_equal_to(0)", "F2", 2, -1.0),
+        ("less_than_or_equal_to(2)", "F1", 1, 2.5),
+        ("value_is_integer", "F1", 1, 2.5)]
+
+
+def test_chunks_give_the_failures_of_the_whole_file(tmp_path):
+    path = tmp_path / "flood_level.csv"
+    path.write_text(MATRIX)
+    rules = MatrixRules(min_value=0, max_value=2, integer=True, last_day=2)
+    whole = cases(Matrix.load(str(path)).failure_cases(rules))
+    chunked, offset, previous_day = [], 0, np.nan
+    for matrix in Matrix.read_chunks(str(path), 2):
+        chunked += cases(matrix.failure_cases(rules, offset, previous_day))
+        offset += len(matrix.days)
+        previous_day = matrix.days[-1]
+    assert sorted(chunked) == sorted(whole)
+
+
+def test_day_going_back_across_chunks():
+    first = Matrix.from_frame(pd.DataFrame({"Day": [0, 1], "F1": [0, 0]}))
+    second = Matrix.from_frame(pd.DataFrame({"Day": [1, 2], "F1": [0, 0]}))
+    assert first.failure_cases(MatrixRules()) is None
+    assert sorted(cases(second.failure_cases(MatrixRules(), 2, first.days[-1]))) == [
+        ("day_increasing", "Day", 2, 1.0),
+        ("day_sequence", "Day", 2, 1.0),
+        ("day_sequence", "Day", 3, 2.0)]
+
+
+def test_memory_mapped_load(tmp_path):
+    path = tmp_path / "flood_level.csv"
+    path.write_text(MATRIX)
+    cache_dir = str(tmp_path / "matrices")
+    loaded = Matrix.load(str(path), cache_dir)
+    mapped = Matrix.load(str(path), cache_dir)
+    assert isinstance(mapped.values, np.memmap)
+    assert np.array_equal(mapped.values, loaded.values)
+    assert mapped.zones == loaded.zones
+
+
+# Validates flood_level.csv and returns the failures as (check, failure_case)
+def failures(input_dir, monkeypatch):
+    monkeypatch.setattr(fg.fgcheck, "all", {
+        "check": lambda guard: guard.register_for_test(FloodLevelScheme, "flood_level.csv")})
+    guard = fg.FabGuard(str(input_dir))
+    guard.verify(incremental=False)
+    if not os.path.exists(guard.failure_sink.path):
+        return []
+    with open(guard.failure_sink.path) as failure_log:
+        return [(record["check"], record["failure_case"]) for record in map(json.loads, failure_log)]
+
+
+def test_missing_rules_file_is_a_failure(tmp_path, monkeypatch):
+    monkeypatch.setattr(fg.config, "cache_dir", str(tmp_path / "cache"))
+    input_dir = tmp_path / "flee"
+    input_dir.mkdir()
+    (input_dir / "flood_level.csv").write_text("Day,F1,F2\n0,1,2\n1,2,3\n")
+    (input_dir / "sim_period.csv").write_text("StartDate,2010-01-01\nLength,2\n")
+    [(check, failure_case)] = failures(input_dir, monkeypatch)
+    assert check == "matrix_rules"
+    assert "simsettings.yml" in failure_case
+    (input_dir / "simsettings.yml").write_text("move_rules:\n  max_flood_level: 3\n")
+    assert failures(input_dir, monkeypatch) == []
@@ -0,0 +1,29 @@
+import numpy as np
+import pandas as pd
+
+from plugins.FabFlee.fab_guard.network import RouteNetwork, connected_components
+
+
+def test_components_are_labelled_by_their_smallest_node():
+    # 0-1-2 and 3-4 in a chain given in reverse, 5 on its own
+    labels = connected_components(6, [4, 2, 1], [3, 1, 0])
+    assert list(labels) == [0, 0, 0, 3, 3, 5]
+
+
+def test_long_chain_is_one_component():
+    n = 1000
+    order = np.random.default_rng(0).permutation(n)
+    labels = connected_components(n, order[:-1], order[1:])
+    assert (labels == 0).all()
+
+
+def test_route_network():
+    locations = pd.DataFrame({
+        "name": ["A", "B", "C", "D", "E"],
+        "location_type": ["conflict_zone", "town", "camp", "camp", "town"]})
+    # D is only connected to an unknown location, E to nothing
+    routes = pd.DataFrame({"name1": ["A", "B", "D"], "name2": ["B", "C", "X"]})
+    network = RouteNetwork(locations, routes)
+    assert list(network.unreachable(["camp"], ["conflict_zone"])) == [3]
+    assert list(network.isolated()) == [3, 4]
+    assert [list(component) for component in network.components()] == [[0, 1, 2]]
@@ -0,0 +1,77 @@
+import json
+import os
+
+import pytest
+
+import plugins.FabFlee.fab_guard.fab_guard as fg
+from plugins.FabFlee.fab_guard.tests.routes_scheme import RoutesScheme
+from plugins.FabFlee.fab_guard.tests.route_network_scheme import RouteNetworkScheme
+
+# Three locations 0.1 degrees of longitude (about 11 km) apart on the equator
+LOCATIONS = """#name,region,country,lat,lon,location_type,conflict_date,population
+A,R,X,0.0,0.0,conflict_zone,0,1000
+B,R,X,0.0,0.1,town,,1000
+C,R,X,0.0,0.2,camp,,0
+"""
+ROUTES = """name1,name2,distance,forced_redirection
+A,B,11,
+B,C,11,
+"""
+
+
+# Writes a file with a later mtime than the version it replaces, so that the
+# change is seen even when the size stays the same
+def write(path, text):
+    mtime = os.stat(path).st_mtime_ns if os.path.exists(path) else None
+    with open(path, "w") as file:
+        file.write(text)
+    if mtime is not None:
+        os.utime(path, ns=(mtime + 10 ** 9, mtime + 10 ** 9))
+
+
+@pytest.fixture
+def input_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(fg.config, "row_delta", True)
+    monkeypatch.setattr(fg.config, "cache_dir", str(tmp_path / "cache"))
+    input_dir = tmp_path / "flee"
+    input_dir.mkdir()
+    write(input_dir / "locations.csv", LOCATIONS)
+    write(input_dir / "routes.csv", ROUTES)
+    return input_dir
+
+
+# Validates routes.csv with the scheme and returns the checks that failed
+def failed_checks(input_dir, monkeypatch, scheme, incremental=True):
+    monkeypatch.setattr(fg.fgcheck, "all", {
+        "check": lambda guard: guard.register_for_test(scheme, "routes.csv")})
+    guard = fg.FabGuard(str(input_dir))
+    guard.verify(incremental=incremental)
+    if not os.path.exists(guard.failure_sink.path):
+        return []
+    with open(guard.failure_sink.path) as failure_log:
+        return [json.loads(line)["check"] for line in failure_log]
+
+
+def test_change_in_read_file_validates_whole_file(input_dir, monkeypatch):
+    assert failed_checks(input_dir, monkeypatch, RoutesScheme) == []
+    # Moving C makes the unchanged route B,C far too short
+    write(input_dir / "locations.csv", LOCATIONS.replace("C,R,X,0.0,0.2", "C,R,X,0.0,1.0"))
+    expected = failed_checks(input_dir, monkeypatch, RoutesScheme, incremental=False)
+    assert expected == ["distance_matches_coordinates"]
+    assert failed_checks(input_dir, monkeypatch, RoutesScheme) == expected
+
+
+def test_removed_route_validates_whole_network(input_dir, monkeypatch):
+    assert failed_checks(input_dir, monkeypatch, RouteNetworkScheme) == []
+    # Without the route B,C the camp C is isolated and cannot be reached
+    write(input_dir / "routes.csv", ROUTES.replace("B,C,11,\n", ""))
+    assert sorted(failed_checks(input_dir, monkeypatch, RouteNetworkScheme)) == \
+        ["camps_reachable_from_conflict_zone", "locations_not_isolated"]
+
+
+def test_copy_of_existing_row_is_validated(input_dir, monkeypatch):
+    assert failed_checks(input_dir, monkeypatch, RoutesScheme) == []
+    write(input_dir / "routes.csv", ROUTES + "A,B,11,\n")
+    assert failed_checks(input_dir, monkeypatch, RoutesScheme) == ["routes_unique"]
+    # The failure is stored, the next run reports it again
+    assert failed_checks(input_dir, monkeypatch, RoutesScheme) == ["routes_unique"]
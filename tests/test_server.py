@@ -0,0 +1,51 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import plugins.FabFlee.fab_guard.fab_guard as fg
+from plugins.FabFlee.fab_guard.server import ValidationServer, request_validation
+
+from test_row_delta import LOCATIONS, ROUTES, write
+
+# Every age group is 1% of the population at each location
+DISTR_AGE = "Age,A,B\n" + "".join(f"{age},1.0,1.0\n" for age in range(100))
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    monkeypatch.setattr(fg.config, "cache_dir", str(tmp_path / "cache"))
+    server = ValidationServer(str(tmp_path / "fabguard.sock"))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+def input_dir(input_dir, routes):
+    input_dir.mkdir()
+    write(input_dir / "locations.csv", LOCATIONS)
+    write(input_dir / "routes.csv", routes)
+    write(input_dir / "age-distr-new.csv", DISTR_AGE)
+    return str(input_dir)
+
+
+def test_server_validates_with_shipped_registry(tmp_path, server):
+    response = request_validation(input_dir(tmp_path / "flee", ROUTES), server.socket_path)
+    assert response["status"] == "ok", response
+    assert response["errors"] == 0
+
+
+def test_concurrent_requests_log_separately(tmp_path, server):
+    # Without the route B,C the camp C cannot be reached
+    dirs = [input_dir(tmp_path / "valid", ROUTES),
+            input_dir(tmp_path / "broken", ROUTES.replace("B,C,11,\n", ""))]
+    with ThreadPoolExecutor(2) as pool:
+        valid, broken = pool.map(lambda input_dir: request_validation(input_dir, server.socket_path), dirs)
+    assert valid["status"] == broken["status"] == "ok"
+    assert valid["errors"] == 0
+    assert broken["errors"] > 0
+    assert valid["log_file"] != broken["log_file"]
+    assert valid["failure_log"] != broken["failure_log"]
@@ -0,0 +1,41 @@
+import json
+import os
+
+import pytest
+
+import plugins.FabFlee.fab_guard.fab_guard as fg
+from plugins.FabFlee.fab_guard.tests.demographic_scheme import DemographicScheme
+
+
+# Four attributes whose fractions add up to 1 at L1 and to total at L2
+def demographic(total):
+    rest = total - 0.75
+    return f"attr,L1,L2\na0,0.25,0.25\na1,0.25,0.25\na2,0.25,0.25\na3,0.25,{rest!r}\n"
+
+
+# Validates demographic_attr.csv in chunks of two rows and returns the checks that failed
+def failed_checks(tmp_path, monkeypatch, text, chunk_size=2):
+    monkeypatch.setattr(fg.config, "cache_dir", str(tmp_path / "cache"))
+    monkeypatch.setattr(fg.config, "chunk_size", chunk_size)
+    monkeypatch.setattr(fg.fgcheck, "all", {
+        "check": lambda guard: guard.register_for_test(DemographicScheme, "demographic_attr.csv")})
+    input_dir = tmp_path / "flee"
+    input_dir.mkdir(exist_ok=True)
+    (input_dir / "demographic_attr.csv").write_text(text)
+    guard = fg.FabGuard(str(input_dir))
+    guard.verify(incremental=False)
+    if not os.path.exists(guard.failure_sink.path):
+        return []
+    with open(guard.failure_sink.path) as failure_log:
+        return [json.loads(line)["check"] for line in failure_log]
+
+
+@pytest.mark.parametrize("chunk_size", [None, 2])
+def test_sums_within_tolerance_pass(tmp_path, monkeypatch, chunk_size):
+    assert failed_checks(tmp_path, monkeypatch, demographic(1 + 1e-9), chunk_size) == []
+
+
+@pytest.mark.parametrize("chunk_size", [None, 2])
+def test_sums_are_checked_over_all_chunks(tmp_path, monkeypatch, chunk_size):
+    assert failed_checks(tmp_path, monkeypatch, demographic(1.01), chunk_size) == \
+        ["all_but_first_column_sum_is_1"]
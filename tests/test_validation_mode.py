@@ -0,0 +1,18 @@
+import time
+
+from plugins.FabFlee.fab_guard.validation_mode import ValidationMode
+
+
+def test_every_start_gets_its_own_deadline():
+    mode = ValidationMode.timed(0.05)
+    first = mode.start()
+    time.sleep(0.1)
+    assert first.expired()
+    second = mode.start()
+    assert not second.expired()
+    assert mode.deadline is None
+
+
+def test_started_mode_keeps_its_deadline():
+    started = ValidationMode.timed(60).start()
+    assert started.start().deadline == started.deadline